@@ -0,0 +1,17 @@
+from app import app, db
+from sqlalchemy import inspect, text
+
+def add_audio_stream_column():
+    with app.app_context():
+        inspector = inspect(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('chapters')]
+
+        if 'audio_stream' not in columns:
+            with db.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE chapters ADD COLUMN audio_stream VARCHAR(255)"))
+                print("✅ Column 'audio_stream' added.")
+        else:
+            print("ℹ️ Column 'audio_stream' already exists.")
+
+if __name__ == '__main__':
+    add_audio_stream_column()
@@ -0,0 +1,41 @@
+from app import app, db
+from sqlalchemy import inspect, text
+
+# (table, column, referenced table)
+CASCADES = [
+    ('chapters', 'story_id', 'stories'),
+    ('comments', 'story_id', 'stories'),
+    ('comments', 'chapter_id', 'chapters'),
+    ('likes', 'story_id', 'stories'),
+    ('likes', 'user_id', 'users'),
+    ('history', 'story_id', 'stories'),
+    ('history', 'user_id', 'users'),
+]
+
+def add_cascade_constraints():
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            # SQLite cannot add constraints to existing tables; delete_story_rows()
+            # removes dependent rows explicitly, and new databases get the constraints.
+            print("ℹ️ Only PostgreSQL tables can be altered in place, nothing to do.")
+            return
+
+        inspector = inspect(db.engine)
+        with db.engine.begin() as conn:
+            for table, column, parent in CASCADES:
+                # Orphans left behind by earlier deletes would make the constraint fail
+                conn.execute(text(
+                    f"DELETE FROM {table} WHERE {column} IS NOT NULL "
+                    f"AND {column} NOT IN (SELECT id FROM {parent})"
+                ))
+                for fk in inspector.get_foreign_keys(table):
+                    if fk['constrained_columns'] == [column]:
+                        conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {fk['name']}"))
+                conn.execute(text(
+                    f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{column} "
+                    f"FOREIGN KEY ({column}) REFERENCES {parent} (id) ON DELETE CASCADE"
+                ))
+                print(f"✅ {table}.{column} now cascades from {parent}.")
+
+if __name__ == '__main__':
+    add_cascade_constraints()
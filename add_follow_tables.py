@@ -0,0 +1,21 @@
+from app import app, db
+from sqlalchemy import inspect, text
+
+def add_follow_tables():
+    with app.app_context():
+        # Creates follows / timeline_entries; existing tables are left untouched
+        db.create_all()
+
+        columns = [col['name'] for col in inspect(db.engine).get_columns('users')]
+        with db.engine.begin() as conn:
+            if 'follower_count' not in columns:
+                conn.execute(text("ALTER TABLE users ADD COLUMN follower_count INTEGER NOT NULL DEFAULT 0"))
+                print("✅ Column 'follower_count' added.")
+            else:
+                print("ℹ️ Column 'follower_count' already exists.")
+            # Feeds look up an author's stories by name
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_stories_author ON stories (author)"))
+        print("✅ Follow and timeline tables are in place.")
+
+if __name__ == '__main__':
+    add_follow_tables()
@@ -0,0 +1,47 @@
+import gzip
+import os
+from app import app, db, ProfileCapture
+from sqlalchemy import inspect, text, update
+
+# Profile captures used to be files in profiles/, which each dyno or container kept
+# to itself. They now live in profile_captures.data; this adds the column and moves
+# the captures found in profiles/ into it. The folder can be deleted afterwards.
+OLD_PROFILE_FOLDER = 'profiles'
+
+def add_profile_data_column():
+    with app.app_context():
+        inspector = inspect(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('profile_captures')]
+
+        if 'data' not in columns:
+            blob = 'BYTEA' if db.engine.dialect.name == 'postgresql' else 'BLOB'
+            with db.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE profile_captures ADD COLUMN data {blob}"))
+                print("✅ Column 'data' added.")
+        else:
+            print("ℹ️ Column 'data' already exists.")
+
+        if not os.path.isdir(OLD_PROFILE_FOLDER):
+            return
+        rows = (
+            ProfileCapture.query.with_entities(ProfileCapture.id, ProfileCapture.filename)
+            .filter(ProfileCapture.data.is_(None))
+            .all()
+        )
+        moved = 0
+        for row in rows:
+            path = os.path.join(OLD_PROFILE_FOLDER, row.filename or '')
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                data = gzip.compress(f.read())
+            db.session.execute(
+                update(ProfileCapture).where(ProfileCapture.id == row.id).values(data=data),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            moved += 1
+        print(f"✅ Moved {moved} capture(s) from {OLD_PROFILE_FOLDER}/ into the database.")
+
+if __name__ == '__main__':
+    add_profile_data_column()
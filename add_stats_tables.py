@@ -0,0 +1,40 @@
+from app import app, db, ReadCounter, READ_COUNTER_SLOTS
+from sqlalchemy import func, text
+
+def add_stats_tables():
+    with app.app_context():
+        # Creates daily_stats / site_stats / read_counters; existing tables are left untouched
+        db.create_all()
+
+        with db.engine.begin() as conn:
+            # The admin tables sort and page on the bare columns, which needs them NOT NULL
+            conn.execute(text("UPDATE stories SET reads = 0 WHERE reads IS NULL"))
+            conn.execute(text("UPDATE stories SET votes = 0 WHERE votes IS NULL"))
+            if db.engine.dialect.name == 'postgresql':
+                conn.execute(text(
+                    "ALTER TABLE stories ALTER COLUMN reads SET DEFAULT 0, ALTER COLUMN reads SET NOT NULL, "
+                    "ALTER COLUMN votes SET DEFAULT 0, ALTER COLUMN votes SET NOT NULL"
+                ))
+            # SQLite cannot add NOT NULL to an existing column without rebuilding the
+            # table; there the model defaults keep new rows at 0
+
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_stories_reads ON stories (reads)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_stories_votes ON stories (votes)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_stories_title ON stories (title)"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_chapters_narration_backlog ON chapters (id) "
+                "WHERE audio_file IS NULL"
+            ))
+
+        if db.session.query(func.count(ReadCounter.slot)).scalar() == 0:
+            # Start the counters from the reads recorded so far, once
+            existing = db.session.execute(text("SELECT COALESCE(SUM(reads), 0) FROM stories")).scalar()
+            db.session.add_all([
+                ReadCounter(slot=slot, reads=existing if slot == 0 else 0)
+                for slot in range(READ_COUNTER_SLOTS)
+            ])
+            db.session.commit()
+        print("✅ Stats tables and story indexes are in place.")
+
+if __name__ == '__main__':
+    add_stats_tables()
@@ -0,0 +1,12 @@
+from app import app, db
+
+# story_changes feeds every worker's typeahead index. Story create, edit and delete
+# write to it, so run this before deploying on databases that predate it.
+def add_story_changes_table():
+    with app.app_context():
+        # Creates story_changes; existing tables are left untouched
+        db.create_all()
+        print("✅ story_changes table is in place.")
+
+if __name__ == '__main__':
+    add_story_changes_table()
@@ -0,0 +1,25 @@
+from app import app, db
+from sqlalchemy import inspect, text
+
+# Timestamps used by incremental exports (`data_archive.py export --since`).
+# Existing rows keep NULL and are only included in full exports.
+COLUMNS = [
+    ('users', 'created_at'),
+    ('stories', 'updated_at'),
+    ('likes', 'created_at'),
+    ('comments', 'updated_at'),
+]
+
+def add_timestamp_columns():
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table, column in COLUMNS:
+            if column not in [col['name'] for col in inspector.get_columns(table)]:
+                with db.engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} TIMESTAMP"))
+                print(f"✅ Column '{table}.{column}' added.")
+            else:
+                print(f"ℹ️ Column '{table}.{column}' already exists.")
+
+if __name__ == '__main__':
+    add_timestamp_columns()
@@ -1,19 +1,47 @@
 import os
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, g
+from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, g, abort, jsonify, has_request_context
+from flask import Response, stream_with_context
+from flask import before_render_template, template_rendered
+from flask_sqlalchemy.session import Session as FlaskSession
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import relationship
 
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from sqlalchemy import inspect, Column, Integer, create_engine, text, desc
-from sqlalchemy.orm import Session, joinedload
-from datetime import datetime
+from sqlalchemy import inspect, Column, Integer, create_engine, text, desc, func, or_, and_, delete, update, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session, joinedload, undefer
+from sqlalchemy.types import TypeDecorator, LargeBinary
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import TextClause
+from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+import random
 import asyncio
+import json
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+import gzip
 import edge_tts
+from narration_stream import package_narration
+from typeahead import PrefixIndex, hashtags, popularity
+from profiling import start_capture
+from chapter_render import render_chapter
 import uuid
 import jinja2
 
+try:
+    import zstandard
+except ImportError:  # zstd is optional, chapters fall back to zlib
+    zstandard = None
+
 # Load environment variables
 load_dotenv()
 
@@ -22,32 +50,354 @@ app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'devfallbacksecret')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Read replicas: comma-separated URLs, e.g. for local testing
+#   DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS=sqlite:///replica.db
+REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+def _engine_options(url):
+    # gevent workers serve many requests per process, so allow a larger connection pool.
+    # SQLite engines (in-memory ones use StaticPool) take no pool sizing arguments.
+    if not url or url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+    }
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+app.config['SQLALCHEMY_BINDS'] = {
+    f'replica_{i}': {'url': url, **_engine_options(url)} for i, url in enumerate(REPLICA_URLS)
+}
+REPLICA_STICKY_SECONDS = 10  # after a POST the user reads from the primary for this long
+REPLICA_HEALTH_SECONDS = 5  # how long a replica health check result is trusted
+REPLICA_MAX_LAG_SECONDS = 5
 UPLOAD_FOLDER = os.path.join('static', 'covers')
 AUDIO_FOLDER = os.path.join('static', 'audios')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(AUDIO_FOLDER, exist_ok=True)
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+ADMIN_PAGE_SIZE = 50
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # e.g. 0.001 = 1 request in 1000
+PROFILE_SAMPLE_INTERVAL = 0.01  # always-on sampling takes 100 stack samples per second
+PROFILE_KEEP = 200  # captures kept in profile_captures and listed for admins
+TYPEAHEAD_SYNC_SECONDS = 1.0  # how often a worker picks up story edits made by other workers
+TYPEAHEAD_REBUILD_SECONDS = 6 * 3600  # full rebuild refreshes popularity from reads/votes
+TYPEAHEAD_REBUILD_MARKER = 0  # StoryChange.story_id that asks every worker for a full rebuild
+# On PostgreSQL, run `python compress_chapters.py` before deploying this code: chapters.content
+# must be bytea before the app writes compressed chapters into it.
+CHAPTER_COMPRESSION = os.environ.get('CHAPTER_COMPRESSION', 'zstd' if zstandard else 'zlib')
+FEED_PAGE_SIZE = 50
+TIMELINE_LENGTH = 500  # entries kept per reader; older ones fall off the end of the feed
+TIMELINE_BACKFILL = 20  # an author's latest chapters copied into the feed on follow
+FANOUT_BATCH = 1000  # followers written per statement when a chapter is published
+# Authors with more followers than this are not fanned out; their chapters are merged
+# into each follower's feed at read time instead
+FANOUT_MAX_FOLLOWERS = int(os.environ.get('FANOUT_MAX_FOLLOWERS', 10000))
+# hls.js plays the narration streams in browsers without native HLS. It is only loaded
+# from the pinned URL together with its SRI hash (`python hls_js_integrity.py` prints
+# it); without HLS_JS_INTEGRITY those browsers get the plain MP3.
+HLS_JS_URL = 'https://cdn.jsdelivr.net/npm/hls.js@1.5.17/dist/hls.min.js'
+HLS_JS_INTEGRITY = os.environ.get('HLS_JS_INTEGRITY')
+
+class RoutingSession(FlaskSession):
+    """Sends SELECTs from @read_only routes to a healthy replica, everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _is_select(clause):
+            replica = _replica_for_request()
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _is_select(clause):
+    if isinstance(clause, Select):
+        return True
+    return isinstance(clause, TextClause) and clause.text.lstrip().upper().startswith('SELECT')
 
 # Initialize DB
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+
+# SQLite only honours ON DELETE CASCADE when foreign keys are switched on per connection
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+# Replica health: (healthy, checked_at) per bind key, refreshed at most every
+# REPLICA_HEALTH_SECONDS and marked down as soon as a query on the replica fails.
+_replica_health = {}
+
+def _check_replica(key):
+    engine = db.engines[key]
+    try:
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            if engine.dialect.name == 'postgresql':
+                lag = conn.execute(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                )).scalar()
+                return lag <= REPLICA_MAX_LAG_SECONDS
+        return True
+    except Exception as e:
+        print(f"Replica {key} failed its health check:", e)
+        return False
+
+def _replica_is_healthy(key):
+    healthy, checked_at = _replica_health.get(key, (None, 0.0))
+    if time.monotonic() - checked_at > REPLICA_HEALTH_SECONDS:
+        healthy = _check_replica(key)
+        _replica_health[key] = (healthy, time.monotonic())
+    return healthy
+
+def _mark_replica_down(key):
+    def handle_error(context):
+        _replica_health[key] = (False, time.monotonic())
+    return handle_error
+
+with app.app_context():
+    for key in app.config['SQLALCHEMY_BINDS']:
+        event.listen(db.engines[key], 'handle_error', _mark_replica_down(key))
+
+def _replica_for_request():
+    # One replica per request so all of its reads see the same snapshot
+    if not has_request_context() or not g.get('use_replica'):
+        return None
+    if 'replica' not in g:
+        healthy = [key for key in app.config['SQLALCHEMY_BINDS'] if _replica_is_healthy(key)]
+        g.replica = random.choice(healthy) if healthy else None
+    return g.replica
+
+def read_only(view):
+    """Let a route's SELECTs go to a replica, unless the user just wrote something."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if (REPLICA_URLS and request.method in ('GET', 'HEAD')
+                and time.time() >= session.get('primary_until', 0)):
+            g.use_replica = True
+        try:
+            return view(*args, **kwargs)
+        except OperationalError:
+            if not g.get('replica'):
+                raise
+            # The replica broke mid-request (handle_error already marked it down): retry on the primary
+            db.session.rollback()
+            g.use_replica = False
+            g.pop('replica')
+            return view(*args, **kwargs)
+    return wrapper
+
+@app.after_request
+def stick_to_primary_after_write(response):
+    # Read-your-writes: a reader who just commented or liked must not hit a lagging replica
+    if REPLICA_URLS and request.method == 'POST' and response.status_code < 400:
+        session['primary_until'] = time.time() + REPLICA_STICKY_SECONDS
+    return response
+
+# Request profiling
+# Admins add ?_profile=trace|sample (or an X-Profile header) to any URL to capture that
+# request as a speedscope file with its SQL and template timings. PROFILE_SAMPLE_RATE
+# additionally samples a small fraction of all requests at a low rate.
+def _current_capture():
+    return g.get('profile') if has_request_context() else None
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def profile_sql_start(conn, cursor, statement, parameters, context, executemany):
+    capture = _current_capture()
+    if capture is not None:
+        capture.open_span('SQL', ' '.join(statement.split())[:300])
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def profile_sql_end(conn, cursor, statement, parameters, context, executemany):
+    capture = _current_capture()
+    if capture is not None:
+        capture.close_span()
+
+def profile_render_start(sender, template, context, **extra):
+    capture = _current_capture()
+    if capture is not None:
+        capture.open_span('Jinja', template.name)
+
+def profile_render_end(sender, template, context, **extra):
+    capture = _current_capture()
+    if capture is not None:
+        capture.close_span()
+
+before_render_template.connect(profile_render_start, app)
+template_rendered.connect(profile_render_end, app)
+
+@app.before_request
+def start_profiling():
+    mode = request.args.get('_profile') or request.headers.get('X-Profile')
+    if mode and session.get('is_admin'):
+        mode = 'sample' if mode == 'sample' else 'trace'
+        g.profile = start_capture(f'{request.method} {request.full_path}', mode)
+        g.profile_mode = mode
+    elif PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        g.profile = start_capture(f'{request.method} {request.full_path}', 'sample', PROFILE_SAMPLE_INTERVAL)
+        g.profile_mode = 'auto'
+
+@app.after_request
+def save_profile(response):
+    capture = g.pop('profile', None)
+    if capture is None:
+        return response
+    capture.stop()
+
+    totals = capture.summary()['totals']
+    row = ProfileCapture(
+        method=request.method,
+        path=request.full_path[:500],
+        mode=g.profile_mode,
+        username=session.get('username'),
+        status_code=response.status_code,
+        duration_ms=capture.elapsed_ms(capture.finished),
+        sql_count=totals.get('SQL', {}).get('count', 0),
+        sql_ms=totals.get('SQL', {}).get('ms', 0.0),
+        render_ms=totals.get('Jinja', {}).get('ms', 0.0),
+        filename=f'{uuid.uuid4().hex}.speedscope.json',
+        data=capture.speedscope_gzip()
+    )
+
+    # Own session on the primary so the view's session state is left alone
+    with Session(db.engine) as profile_session:
+        profile_session.add(row)
+        profile_session.flush()
+        profile_session.query(ProfileCapture).filter(
+            ProfileCapture.id <= row.id - PROFILE_KEEP
+        ).delete(synchronize_session=False)
+        profile_session.commit()
+        response.headers['X-Profile-Capture'] = str(row.id)
+    return response
+
+@app.teardown_request
+def stop_profiling(exc):
+    # The view raised before after_request ran: make sure the profiler is detached
+    capture = g.pop('profile', None)
+    if capture is not None:
+        capture.stop()
 
 # Jinja2 template loader
 template_loader = jinja2.FileSystemLoader(searchpath=os.path.join(os.path.dirname(__file__), 'templates'))
 app.jinja_loader = template_loader
 
+# Compressed chapter storage
+# Stored values are MAGIC + codec byte + payload. Anything without the prefix is a
+# legacy plain-text row (str on SQLite, UTF-8 bytes on PostgreSQL after the bytea
+# migration) and is returned untouched, so rows can be converted in batches.
+# Dictionary-compressed rows carry the 4-byte id of their dictionary after the codec
+# byte; dictionaries live in the compression_dicts table, never on local disk.
+COMPRESSED_MAGIC = b'\x00RZ'
+CODEC_ZLIB, CODEC_ZSTD, CODEC_ZSTD_DICT = b'z', b's', b'd'
+_codec_state = threading.local()
+_zstd_dicts = {}  # dict id -> ZstdCompressionDict; dictionaries never change once stored
+_zstd_dicts_lock = threading.Lock()
+
+def _load_zstd_dict(sql, params=None):
+    try:
+        with db.engine.connect() as conn:
+            row = conn.execute(text(sql), params or {}).fetchone()
+    except (OperationalError, ProgrammingError):
+        return None  # compression_dicts not created yet
+    if row is None:
+        return None
+    dictionary = zstandard.ZstdCompressionDict(bytes(row.data))
+    _zstd_dicts[row.id] = dictionary
+    return dictionary
+
+def _active_zstd_dict():
+    # The newest dictionary compresses new rows; picked up by workers on restart
+    with _zstd_dicts_lock:
+        if 'active' not in _zstd_dicts:
+            _zstd_dicts['active'] = _load_zstd_dict(
+                "SELECT id, data FROM compression_dicts ORDER BY created_at DESC, id DESC LIMIT 1"
+            )
+        return _zstd_dicts['active']
+
+def _zstd_dict_by_id(dict_id):
+    with _zstd_dicts_lock:
+        dictionary = _zstd_dicts.get(dict_id)
+        if dictionary is None:
+            dictionary = _load_zstd_dict("SELECT id, data FROM compression_dicts WHERE id = :id", {"id": dict_id})
+    if dictionary is None:
+        raise RuntimeError(
+            f'Chapter was compressed with zstd dictionary {dict_id}, '
+            'which is missing from the compression_dicts table'
+        )
+    return dictionary
+
+def _zstd(kind, dictionary=None):
+    # zstd (de)compressors are not thread-safe, so keep one per thread and dictionary
+    key = f'{kind}_{dictionary.dict_id() if dictionary else 0}'
+    if not hasattr(_codec_state, key):
+        options = {'dict_data': dictionary} if dictionary else {}
+        if kind == 'c':
+            setattr(_codec_state, key, zstandard.ZstdCompressor(level=9, **options))
+        else:
+            setattr(_codec_state, key, zstandard.ZstdDecompressor(**options))
+    return getattr(_codec_state, key)
+
+def compress_text(value):
+    raw = value.encode('utf-8')
+    if CHAPTER_COMPRESSION == 'zstd' and zstandard:
+        dictionary = _active_zstd_dict()
+        if dictionary is None:
+            return COMPRESSED_MAGIC + CODEC_ZSTD + _zstd('c').compress(raw)
+        header = COMPRESSED_MAGIC + CODEC_ZSTD_DICT + struct.pack('>I', dictionary.dict_id())
+        return header + _zstd('c', dictionary).compress(raw)
+    return COMPRESSED_MAGIC + CODEC_ZLIB + zlib.compress(raw, 9)
+
+def decompress_text(value):
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    if not value.startswith(COMPRESSED_MAGIC):
+        return value.decode('utf-8')
+
+    codec, payload = value[3:4], value[4:]
+    if codec == CODEC_ZLIB:
+        raw = zlib.decompress(payload)
+    elif zstandard is None:
+        raise RuntimeError('Chapter was stored with zstd but the zstandard package is not installed')
+    elif codec == CODEC_ZSTD_DICT:
+        dict_id, = struct.unpack('>I', payload[:4])
+        raw = _zstd('d', _zstd_dict_by_id(dict_id)).decompress(payload[4:])
+    else:
+        raw = _zstd('d').decompress(payload)
+    return raw.decode('utf-8')
+
+def is_compressed(value):
+    return isinstance(value, (bytes, memoryview)) and bytes(value[:3]) == COMPRESSED_MAGIC
+
+class CompressedText(TypeDecorator):
+    """Text column that is compressed on write and decompressed when loaded."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decompress_text(value)
+
 # Models
 class Story(db.Model):
     __tablename__ = 'stories'
 
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(255), nullable=False)
+    title = db.Column(db.String(255), nullable=False, index=True)
     cover_image = db.Column(db.String(255))
     description = db.Column(db.Text)
-    reads = db.Column(db.Integer, default=0)
-    votes = db.Column(db.Integer, default=0)
+    # NOT NULL so the admin tables can sort and page on the bare indexed columns
+    reads = db.Column(db.Integer, default=0, server_default='0', nullable=False, index=True)
+    votes = db.Column(db.Integer, default=0, server_default='0', nullable=False, index=True)
     parts = db.Column(db.Integer, default=1)
     status = db.Column(db.String(50), default='Ongoing')
-    author = db.Column(db.String(150))
+    author = db.Column(db.String(150), index=True)
+    # Marks the story for incremental exports
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # ✅ Relationship to chapters with cascade
     chapters = db.relationship(
@@ -72,6 +422,9 @@ class User(db.Model):
     email = db.Column(db.String(150), nullable=False)
     password = db.Column(db.String(200), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Kept in step by follow_author(); decides between fan-out and read-time merge
+    follower_count = db.Column(db.Integer, default=0, nullable=False)
 
 class Comment(db.Model):
     __tablename__ = 'comments'
@@ -89,7 +442,8 @@ class Comment(db.Model):
     username = db.Column(db.String(150))
     comment = db.Column(db.Text)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    chapter_id = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)  # set when the comment is edited
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id', ondelete='CASCADE'))
 
 class Chapter(db.Model):
     __tablename__ = 'chapters'
@@ -102,29 +456,761 @@ class Chapter(db.Model):
     )
     author_name = db.Column(db.String(100), nullable=False)
     title = db.Column(db.String(255), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    # Deferred so chapter lists never fetch (or decompress) the prose
+    content = db.deferred(db.Column(CompressedText, nullable=False))
+    # Filled by prepare_chapter() on save; the reader serves content_html as-is
+    content_html = db.deferred(db.Column(CompressedText))
+    word_count = db.Column(db.Integer)
+    reading_seconds = db.Column(db.Integer)
+    listening_seconds = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     audio_file = db.Column(db.String(255))
+    audio_stream = db.Column(db.String(255))  # HLS master playlist, relative to static/
     views = db.Column(db.Integer, default=0)
 
+    __table_args__ = (
+        # Holds only chapters without audio, so counting the backlog reads just those rows
+        db.Index('ix_chapters_narration_backlog', 'id',
+                 sqlite_where=db.text('audio_file IS NULL'),
+                 postgresql_where=db.text('audio_file IS NULL')),
+    )
+
     # ❌ Remove this line (no relationship in Chapter):
     # story = db.relationship(...)
 
 class Like(db.Model):
     __tablename__ = 'likes'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=False)
-    story_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    story_id = db.Column(db.Integer, db.ForeignKey('stories.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     __table_args__ = (db.UniqueConstraint('user_id', 'story_id', name='unique_like'),)
 
 class History(db.Model):
     __tablename__ = 'history'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=False)
-    story_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    story_id = db.Column(db.Integer, db.ForeignKey('stories.id', ondelete='CASCADE'), nullable=False)
     viewed_at = db.Column(db.DateTime, default=datetime.utcnow)
     __table_args__ = (db.UniqueConstraint('user_id', 'story_id', name='unique_history'),)
 
+class Follow(db.Model):
+    __tablename__ = 'follows'
+    id = db.Column(db.Integer, primary_key=True)
+    follower_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.UniqueConstraint('follower_id', 'author_id', name='unique_follow'),
+        db.Index('ix_follows_author', 'author_id', 'id'),  # fan-out walks an author's followers
+    )
+
+class TimelineEntry(db.Model):
+    __tablename__ = 'timeline_entries'
+    # Each reader's feed, materialized when followed authors publish. The unique index
+    # (user_id, chapter_id) is the feed query: one range scan, newest chapter first.
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id', ondelete='CASCADE'), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    __table_args__ = (db.UniqueConstraint('user_id', 'chapter_id', name='unique_timeline_entry'),)
+
+class StoryChange(db.Model):
+    __tablename__ = 'story_changes'
+    # Append-only log of story create/edit/delete so every worker's typeahead index can
+    # apply the same incremental updates. Rows carry the indexed fields before and after.
+    id = db.Column(db.Integer, primary_key=True)
+    story_id = db.Column(db.Integer, nullable=False)
+    old_title = db.Column(db.String(255))
+    old_author = db.Column(db.String(150))
+    old_tags = db.Column(db.Text)
+    old_score = db.Column(db.Integer)
+    new_title = db.Column(db.String(255))
+    new_author = db.Column(db.String(150))
+    new_tags = db.Column(db.Text)
+    new_score = db.Column(db.Integer)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class CompressionDict(db.Model):
+    __tablename__ = 'compression_dicts'
+    # zstd dictionaries for chapter content. Rows are never updated or deleted: every
+    # chapter compressed with a dictionary names it by id and needs it to be read.
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=False)  # zstd dict id
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ProfileCapture(db.Model):
+    __tablename__ = 'profile_captures'
+    id = db.Column(db.Integer, primary_key=True)
+    method = db.Column(db.String(10))
+    path = db.Column(db.String(500))
+    mode = db.Column(db.String(20))  # trace, sample or auto (always-on sampling)
+    username = db.Column(db.String(150))
+    status_code = db.Column(db.Integer)
+    duration_ms = db.Column(db.Float)
+    sql_count = db.Column(db.Integer)
+    sql_ms = db.Column(db.Float)
+    render_ms = db.Column(db.Float)
+    filename = db.Column(db.String(255))  # download name
+    data = db.deferred(db.Column(db.LargeBinary))  # gzipped speedscope JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DailyStat(db.Model):
+    __tablename__ = 'daily_stats'
+    day = db.Column(db.Date, primary_key=True)
+    signups = db.Column(db.Integer, default=0)
+    reads = db.Column(db.Integer, default=0)
+    likes = db.Column(db.Integer, default=0)
+    comments = db.Column(db.Integer, default=0)
+
+class SiteStats(db.Model):
+    __tablename__ = 'site_stats'
+    # Single row (id=1) holding the rollup watermarks and the latest snapshot
+    id = db.Column(db.Integer, primary_key=True)
+    last_user_id = db.Column(db.Integer, default=0)
+    last_like_id = db.Column(db.Integer, default=0)
+    last_comment_id = db.Column(db.Integer, default=0)
+    total_reads = db.Column(db.Integer, default=0)
+    narration_backlog = db.Column(db.Integer, default=0)
+    top_stories = db.Column(db.Text)  # JSON list of {id, title, reads}
+    updated_at = db.Column(db.DateTime)
+
+class ReadCounter(db.Model):
+    __tablename__ = 'read_counters'
+    # Site-wide story reads, spread over READ_COUNTER_SLOTS rows so concurrent views
+    # rarely update the same row; the rollup sums these few rows, not the stories table
+    slot = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    reads = db.Column(db.BigInteger, default=0, nullable=False)
+
+READ_COUNTER_SLOTS = 16
+
+def count_read():
+    db.session.execute(
+        update(ReadCounter).where(ReadCounter.slot == random.randrange(READ_COUNTER_SLOTS))
+        .values(reads=ReadCounter.reads + 1),
+        execution_options={'synchronize_session': False}
+    )
+
+def _count_new_rows(table, last_id):
+    # Only touches rows past the watermark, so the cost is proportional to new activity
+    count, max_id = db.session.execute(
+        text(f"SELECT COUNT(*), MAX(id) FROM {table} WHERE id > :last"),
+        {"last": last_id}
+    ).one()
+    return count, (max_id or last_id)
+
+def rollup_site_stats():
+    """Fold activity since the last run into today's DailyStat row and refresh the snapshot.
+
+    Meant to be run periodically (see rollup_stats.py). The first run only records
+    a baseline, so existing rows are not all attributed to the day of install.
+    """
+    stats = db.session.get(SiteStats, 1)
+    first_run = stats is None
+    if first_run:
+        stats = SiteStats(id=1, last_user_id=0, last_like_id=0, last_comment_id=0, total_reads=0)
+        db.session.add(stats)
+
+    signups, stats.last_user_id = _count_new_rows('users', stats.last_user_id or 0)
+    likes, stats.last_like_id = _count_new_rows('likes', stats.last_like_id or 0)
+    comments, stats.last_comment_id = _count_new_rows('comments', stats.last_comment_id or 0)
+
+    total_reads = db.session.query(func.coalesce(func.sum(ReadCounter.reads), 0)).scalar()
+    reads = max(total_reads - (stats.total_reads or 0), 0)
+    stats.total_reads = total_reads
+
+    if not first_run:
+        today = date.today()
+        bucket = db.session.get(DailyStat, today)
+        if bucket is None:
+            bucket = DailyStat(day=today, signups=0, reads=0, likes=0, comments=0)
+            db.session.add(bucket)
+        bucket.signups += signups
+        bucket.reads += reads
+        bucket.likes += likes
+        bucket.comments += comments
+
+    top = (
+        Story.query
+        .with_entities(Story.id, Story.title, Story.reads)
+        .order_by(Story.reads.desc())
+        .limit(5)
+        .all()
+    )
+    stats.top_stories = json.dumps([{"id": s.id, "title": s.title, "reads": s.reads} for s in top])
+    stats.narration_backlog = (
+        db.session.query(func.count(Chapter.id)).filter(Chapter.audio_file.is_(None)).scalar()
+    )
+    stats.updated_at = datetime.utcnow()
+    db.session.commit()
+    return stats
+
+def keyset_page(query, sort_col, id_col, cast, descending, cursor):
+    """Return one page of `query` after `cursor` ("<sort value>:<id>") plus the next cursor.
+
+    `sort_col` must be NOT NULL and indexed, so every page is an index range read.
+    """
+    if cursor:
+        try:
+            value, last_id = cursor.rsplit(':', 1)
+            value, last_id = cast(value), int(last_id)
+        except ValueError:
+            cursor = None
+    if cursor:
+        if descending:
+            query = query.filter(or_(sort_col < value, and_(sort_col == value, id_col < last_id)))
+        else:
+            query = query.filter(or_(sort_col > value, and_(sort_col == value, id_col > last_id)))
+
+    order = (sort_col.desc(), id_col.desc()) if descending else (sort_col.asc(), id_col.asc())
+    rows = query.order_by(*order).limit(ADMIN_PAGE_SIZE + 1).all()
+
+    next_cursor = None
+    if len(rows) > ADMIN_PAGE_SIZE:
+        rows = rows[:ADMIN_PAGE_SIZE]
+        last = rows[-1]
+        next_cursor = f"{getattr(last, sort_col.key)}:{last.id}"
+    return rows, next_cursor
+
+def prefix_filter(column, prefix):
+    # A range instead of LIKE 'x%' so a plain btree index serves it on every backend
+    return and_(column >= prefix, column < prefix + '\U0010ffff')
+
+def delete_story_rows(story_id):
+    """Delete a story and its dependent rows with one set-based statement per table.
+
+    The explicit deletes mirror the ON DELETE CASCADE constraints so databases created
+    before those constraints existed are cleaned up too. Media files are left for
+    media_gc.py to reclaim.
+    """
+    db.session.execute(
+        delete(TimelineEntry).where(
+            TimelineEntry.chapter_id.in_(db.session.query(Chapter.id).filter(Chapter.story_id == story_id))
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    for model in (Comment, Like, History, Chapter):
+        db.session.execute(
+            delete(model).where(model.story_id == story_id),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.execute(
+        delete(Story).where(Story.id == story_id),
+        execution_options={'synchronize_session': False}
+    )
+
+def delete_user_rows(user_id):
+    """Delete a user and their likes/history/follows without loading them into the session."""
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(db.session.query(Follow.author_id).filter(Follow.follower_id == user_id)))
+        .values(follower_count=User.follower_count - 1),
+        execution_options={'synchronize_session': False}
+    )
+    for model in (Like, History):
+        db.session.execute(
+            delete(model).where(model.user_id == user_id),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.execute(
+        delete(TimelineEntry).where(or_(TimelineEntry.user_id == user_id, TimelineEntry.author_id == user_id)),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.execute(
+        delete(Follow).where(or_(Follow.follower_id == user_id, Follow.author_id == user_id)),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.execute(
+        delete(User).where(User.id == user_id),
+        execution_options={'synchronize_session': False}
+    )
+
+# Export / import
+# An archive is NDJSON: a header line, then one {"type": ..., "row": {...}} line per
+# row, table by table in foreign-key order. Each table is read with a server-side
+# cursor in EXPORT_BATCH-row partitions, so memory stays flat however big the database
+# is. Chapters carry plain text; compression and pre-rendering are redone on import.
+ARCHIVE_VERSION = 1
+EXPORT_BATCH = 1000
+IMPORT_BATCH = 1000
+ARCHIVE_CHUNK_BYTES = 64 * 1024
+# (record type, model, column that marks a row as new or changed since the last export)
+ARCHIVE_TABLES = [
+    ('user', User, User.created_at),
+    ('story', Story, Story.updated_at),
+    ('chapter', Chapter, Chapter.created_at),
+    ('comment', Comment, func.coalesce(Comment.updated_at, Comment.timestamp)),
+    ('like', Like, Like.created_at),
+    ('history', History, History.viewed_at),
+    ('follow', Follow, Follow.created_at),
+]
+# Recomputed from content on import
+DERIVED_COLUMNS = {'content_html', 'word_count', 'reading_seconds', 'listening_seconds'}
+# Tables whose rows are only ever inserted; conflicts on import keep the existing row
+INSERT_ONLY = {'like', 'history', 'follow'}
+# Columns holding a users.id, rewritten on import for archive users merged by username
+USER_REFERENCES = {'like': ['user_id'], 'history': ['user_id'], 'follow': ['follower_id', 'author_id']}
+
+def export_records(since=None):
+    """Yield archive records for every row, or only rows created/changed at or after `since`.
+
+    Rows are capped at each table's highest id when the export starts, so a row never
+    references one the export has already passed. Deletions are not exported.
+    """
+    yield {
+        'type': 'header', 'version': ARCHIVE_VERSION,
+        'exported_at': datetime.utcnow().isoformat(),
+        'since': since.isoformat() if since else None,
+    }
+    ceilings = {
+        kind: db.session.query(func.coalesce(func.max(model.id), 0)).scalar()
+        for kind, model, _ in ARCHIVE_TABLES
+    }
+    for kind, model, changed_at in ARCHIVE_TABLES:
+        columns = [col for col in model.__table__.columns if col.name not in DERIVED_COLUMNS]
+        query = db.select(*columns).where(model.id <= ceilings[kind]).order_by(model.id)
+        if since:
+            query = query.where(changed_at >= since)
+        for row in db.session.execute(query, execution_options={'yield_per': EXPORT_BATCH}):
+            yield {'type': kind, 'row': dict(row._mapping)}
+
+def _archive_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def archive_chunks(records, compress=False):
+    """Encode records as NDJSON in chunks of about ARCHIVE_CHUNK_BYTES, gzipped if `compress`."""
+    gzip = zlib.compressobj(wbits=31) if compress else None
+    buffer, size = [], 0
+    for record in records:
+        line = json.dumps(record, default=_archive_value, separators=(',', ':')) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= ARCHIVE_CHUNK_BYTES:
+            chunk = ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+            chunk = gzip.compress(chunk) if gzip else chunk
+            if chunk:
+                yield chunk
+    chunk = ''.join(buffer).encode('utf-8')
+    yield gzip.compress(chunk) + gzip.flush() if gzip else chunk
+
+def _merge_users_by_username(rows, user_ids):
+    """Drop archive users whose username belongs to a different id in this database.
+
+    Their ids are mapped to the existing account in `user_ids`, which stories, chapters
+    and comments already reach by username. Returns the remaining rows and the conflicts.
+    """
+    archive_ids = {row['username']: row['id'] for row in rows}
+    existing = db.session.execute(
+        select(User.id, User.username).where(User.username.in_(list(archive_ids)))
+    ).all()
+    conflicts = []
+    for local_id, username in existing:
+        if local_id != archive_ids[username]:
+            user_ids[archive_ids[username]] = local_id
+            conflicts.append({'id': archive_ids[username], 'username': username, 'existing_id': local_id})
+    merged = {conflict['id'] for conflict in conflicts}
+    return [row for row in rows if row['id'] not in merged], conflicts
+
+def _import_batch(kind, model, rows, user_ids):
+    """Upsert one batch of `kind` rows; returns the user rows skipped as conflicts."""
+    table = model.__table__
+    conflicts = []
+    if kind == 'user':
+        rows, conflicts = _merge_users_by_username(rows, user_ids)
+        if not rows:
+            return conflicts
+    for column in USER_REFERENCES.get(kind, []):
+        for row in rows:
+            row[column] = user_ids.get(row[column], row[column])
+    for column in table.columns:
+        if isinstance(column.type, db.DateTime):
+            for row in rows:
+                if row.get(column.name):
+                    row[column.name] = datetime.fromisoformat(row[column.name])
+    if kind == 'chapter':
+        for row in rows:
+            (row['content_html'], row['word_count'],
+             row['reading_seconds'], row['listening_seconds']) = render_chapter(row['content'])
+
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    statement = dialect.insert(table)
+    if kind in INSERT_ONLY:
+        statement = statement.on_conflict_do_nothing()
+    else:
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={name: statement.excluded[name] for name in rows[0] if name != 'id'}
+        )
+    db.session.execute(statement, rows)
+    if kind in ('user', 'follow'):
+        # Follows are insert-only and users carry the source's count, so recount the
+        # affected authors from the follows now in this database
+        author_ids = {row['id'] if kind == 'user' else row['author_id'] for row in rows}
+        db.session.execute(
+            update(User).where(User.id.in_(author_ids)).values(
+                follower_count=db.select(func.count(Follow.id))
+                .where(Follow.author_id == User.id).scalar_subquery()
+            ),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.commit()
+    return conflicts
+
+def import_records(records, batch_size=IMPORT_BATCH):
+    """Load archive records with batched upserts.
+
+    Existing rows with the same id are overwritten, so an archive can be replayed on
+    top of an earlier restore, e.g. to apply an incremental export. An archive user
+    whose username is taken by another id here is not written: the existing account
+    is kept and the archive's likes, history and follows are attached to it.
+
+    Returns the rows written per type and the list of conflicting user rows.
+    """
+    models = {kind: model for kind, model, _ in ARCHIVE_TABLES}
+    counts, conflicts, user_ids = {}, [], {}
+    kind, rows = None, []
+    for record in records:
+        if record.get('type') == 'header':
+            if record.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f"Unsupported archive version {record.get('version')!r}")
+            continue
+        if record.get('type') not in models:
+            raise ValueError(f"Unknown record type {record.get('type')!r}")
+        if rows and (record['type'] != kind or len(rows) >= batch_size):
+            skipped = _import_batch(kind, models[kind], rows, user_ids)
+            counts[kind] = counts.get(kind, 0) + len(rows) - len(skipped)
+            conflicts += skipped
+            rows = []
+        kind = record['type']
+        rows.append(record['row'])
+    if rows:
+        skipped = _import_batch(kind, models[kind], rows, user_ids)
+        counts[kind] = counts.get(kind, 0) + len(rows) - len(skipped)
+        conflicts += skipped
+
+    if db.engine.dialect.name == 'postgresql':
+        # Rows arrived with their ids, so move each sequence past the highest one
+        for imported in counts:
+            table = models[imported].__tablename__
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            ))
+    if 'story' in counts:
+        request_typeahead_rebuild()
+    db.session.commit()
+    return counts, conflicts
+
+# Background work
+# Narration runs off the request path so a slow TTS call never holds a web worker.
+# Under gevent the job goes to the hub's pool of real OS threads, because edge_tts
+# runs its own asyncio loop, which does not mix with monkey-patched greenlets.
+_background_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('BACKGROUND_THREADS', 2)))
+
+def run_in_background(fn, *args):
+    try:
+        from gevent import monkey, get_hub
+    except ImportError:
+        monkey = None
+
+    if monkey and monkey.is_module_patched('threading'):
+        get_hub().threadpool.spawn(fn, *args)
+    else:
+        _background_pool.submit(fn, *args)
+
+def prepare_chapter(chapter):
+    """Pre-render `chapter.content` into stored HTML and reading metadata."""
+    (chapter.content_html, chapter.word_count,
+     chapter.reading_seconds, chapter.listening_seconds) = render_chapter(chapter.content)
+    return chapter
+
+def narrate_chapter(chapter_id, content):
+    audio_name = f'chapter_{chapter_id}.mp3'
+    audio_path = os.path.join(AUDIO_FOLDER, audio_name)
+
+    async def generate_audio():
+        communicate = edge_tts.Communicate(content, voice="en-US-GuyNeural")
+        await communicate.save(audio_path)
+
+    try:
+        asyncio.run(generate_audio())
+    except Exception as e:
+        print(f"Narration failed for chapter {chapter_id}:", e)
+        return
+
+    # Segmented low-bitrate variants; the plain MP3 stays as the fallback
+    audio_stream = package_narration(chapter_id, audio_path)
+
+    with app.app_context():
+        db.session.execute(
+            update(Chapter).where(Chapter.id == chapter_id)
+            .values(audio_file=audio_name, audio_stream=audio_stream),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+
+# Feeds
+# Publishing a chapter writes one timeline row per follower (fan-out on write), in
+# batches, off the request path. Authors above FANOUT_MAX_FOLLOWERS are skipped and
+# their recent chapters are merged into the feed when it is read instead.
+# ON CONFLICT DO NOTHING (SQLite 3.24+ and PostgreSQL) makes a fan-out that races
+# with a follow's backfill harmless.
+_INSERT_TIMELINE = text(
+    "INSERT INTO timeline_entries (user_id, chapter_id, author_id) "
+    "VALUES (:user_id, :chapter_id, :author_id) ON CONFLICT DO NOTHING"
+)
+# Drop everything older than the reader's TIMELINE_LENGTH-th entry; a no-op while the
+# timeline is shorter, because the subquery is then NULL
+_TRIM_TIMELINE = text(
+    "DELETE FROM timeline_entries WHERE user_id = :user_id AND chapter_id < ("
+    "SELECT chapter_id FROM timeline_entries WHERE user_id = :user_id "
+    "ORDER BY chapter_id DESC LIMIT 1 OFFSET :keep)"
+)
+
+def fan_out_chapter(chapter_id):
+    with app.app_context():
+        author = (
+            db.session.query(User.id, User.follower_count)
+            .join(Story, Story.author == User.username)
+            .join(Chapter, Chapter.story_id == Story.id)
+            .filter(Chapter.id == chapter_id)
+            .first()
+        )
+        if author is None or author.follower_count > FANOUT_MAX_FOLLOWERS:
+            return
+
+        last_id = 0
+        while True:
+            followers = (
+                db.session.query(Follow.id, Follow.follower_id)
+                .filter(Follow.author_id == author.id, Follow.id > last_id)
+                .order_by(Follow.id)
+                .limit(FANOUT_BATCH)
+                .all()
+            )
+            if not followers:
+                break
+            db.session.execute(_INSERT_TIMELINE, [
+                {"user_id": f.follower_id, "chapter_id": chapter_id, "author_id": author.id}
+                for f in followers
+            ])
+            db.session.execute(_TRIM_TIMELINE, [
+                {"user_id": f.follower_id, "keep": TIMELINE_LENGTH - 1} for f in followers
+            ])
+            db.session.commit()
+            last_id = followers[-1].id
+
+def publish_chapter(chapter):
+    """Deliver a newly committed chapter to the feeds of its author's followers."""
+    run_in_background(fan_out_chapter, chapter.id)
+
+def follow_author(user_id, author):
+    """Follow `author` (a User), copying their latest chapters into the reader's feed."""
+    db.session.add(Follow(follower_id=user_id, author_id=author.id))
+    db.session.execute(
+        update(User).where(User.id == author.id).values(follower_count=User.follower_count + 1),
+        execution_options={'synchronize_session': False}
+    )
+    if author.follower_count < FANOUT_MAX_FOLLOWERS:
+        recent = (
+            db.session.query(Chapter.id)
+            .join(Story, Story.id == Chapter.story_id)
+            .filter(Story.author == author.username)
+            .order_by(Chapter.id.desc())
+            .limit(TIMELINE_BACKFILL)
+            .all()
+        )
+        if recent:
+            db.session.execute(_INSERT_TIMELINE, [
+                {"user_id": user_id, "chapter_id": chapter.id, "author_id": author.id}
+                for chapter in recent
+            ])
+            db.session.execute(_TRIM_TIMELINE, {"user_id": user_id, "keep": TIMELINE_LENGTH - 1})
+
+def unfollow_author(user_id, author):
+    deleted = db.session.execute(
+        delete(Follow).where(Follow.follower_id == user_id, Follow.author_id == author.id),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    if deleted:
+        db.session.execute(
+            update(User).where(User.id == author.id).values(follower_count=User.follower_count - 1),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.execute(
+        delete(TimelineEntry).where(TimelineEntry.user_id == user_id, TimelineEntry.author_id == author.id),
+        execution_options={'synchronize_session': False}
+    )
+
+def feed_chapters(user_id, before=None):
+    """Newest chapters from followed authors: the materialized timeline plus a merge
+    of authors too big to fan out."""
+    columns = (
+        Chapter.id, Chapter.title, Chapter.created_at, Chapter.word_count, Chapter.reading_seconds,
+        Story.id.label('story_id'), Story.title.label('story_title'), Story.author,
+    )
+    timeline = (
+        db.session.query(*columns)
+        .select_from(TimelineEntry)
+        .join(Chapter, Chapter.id == TimelineEntry.chapter_id)
+        .join(Story, Story.id == Chapter.story_id)
+        .filter(TimelineEntry.user_id == user_id)
+    )
+    if before:
+        timeline = timeline.filter(TimelineEntry.chapter_id < before)
+    rows = timeline.order_by(TimelineEntry.chapter_id.desc()).limit(FEED_PAGE_SIZE).all()
+
+    big_authors = [
+        name for name, in db.session.query(User.username)
+        .join(Follow, Follow.author_id == User.id)
+        .filter(Follow.follower_id == user_id, User.follower_count > FANOUT_MAX_FOLLOWERS)
+    ]
+    if big_authors:
+        merged = db.session.query(*columns).join(Story, Story.id == Chapter.story_id).filter(Story.author.in_(big_authors))
+        if before:
+            merged = merged.filter(Chapter.id < before)
+        merged = merged.order_by(Chapter.id.desc()).limit(FEED_PAGE_SIZE).all()
+        # An author who crossed the threshold can have chapters in both lists
+        rows = sorted({row.id: row for row in rows + merged}.values(), key=lambda row: -row.id)
+        rows = rows[:FEED_PAGE_SIZE]
+
+    next_before = rows[-1].id if len(rows) == FEED_PAGE_SIZE else None
+    return rows, next_before
+
+NARRATION_BATCH = 20  # backlog chapters narrated per rollup run
+NARRATION_GRACE_SECONDS = 600  # newer chapters may still be narrating in the background
+
+def narrate_backlog(limit=NARRATION_BATCH):
+    """Narrate the oldest chapters without audio; returns how many now have it."""
+    cutoff = datetime.utcnow() - timedelta(seconds=NARRATION_GRACE_SECONDS)
+    chapters = (
+        Chapter.query.options(undefer(Chapter.content))
+        .filter(Chapter.audio_file.is_(None), Chapter.created_at < cutoff)
+        .order_by(Chapter.id)
+        .limit(limit)
+        .all()
+    )
+    jobs = [(chapter.id, chapter.content) for chapter in chapters]
+    db.session.rollback()  # don't hold a transaction open through the TTS calls
+
+    for chapter_id, content in jobs:
+        narrate_chapter(chapter_id, content)
+    return db.session.query(func.count(Chapter.id)).filter(
+        Chapter.id.in_([chapter_id for chapter_id, _ in jobs]), Chapter.audio_file.isnot(None)
+    ).scalar()
+
+# Typeahead
+_typeahead = PrefixIndex()
+_typeahead_lock = threading.Lock()
+_typeahead_state = {'built_at': None, 'last_change': 0, 'synced_at': 0.0, 'rebuilding': False}
+
+def story_snapshot(story):
+    """The fields the typeahead index needs from a story, for StoryChange rows."""
+    return {
+        'title': story.title,
+        'author': story.author,
+        'tags': ' '.join(f'#{tag}' for tag in sorted(hashtags(story.description))),
+        'score': popularity(story.reads, story.votes),
+    }
+
+def record_story_change(story_id, before=None, after=None):
+    # Added to the current transaction so the log commits together with the story
+    change = StoryChange(story_id=story_id)
+    for prefix, snapshot in (('old_', before), ('new_', after)):
+        for field, value in (snapshot or {}).items():
+            setattr(change, prefix + field, value)
+    db.session.add(change)
+
+def request_typeahead_rebuild():
+    # A marker row instead of one StoryChange per story: bulk loads would otherwise
+    # make every worker replay millions of single inserts
+    db.session.add(StoryChange(story_id=TYPEAHEAD_REBUILD_MARKER))
+
+def build_typeahead():
+    """Load every story into a fresh index and swap it in."""
+    index = PrefixIndex()
+    with db.engine.connect() as conn:
+        # The stories and the StoryChange watermark come from one snapshot: changes up
+        # to the watermark are in the load, later ones are replayed exactly once
+        if conn.dialect.name == 'postgresql':
+            conn.execution_options(isolation_level='REPEATABLE READ')
+        elif conn.dialect.name == 'sqlite':
+            conn.exec_driver_sql('BEGIN')  # pysqlite would run each SELECT on its own
+        last_change = conn.execute(select(func.coalesce(func.max(StoryChange.id), 0))).scalar()
+        rows = conn.execute(
+            select(Story.id, Story.title, Story.author, Story.description, Story.reads, Story.votes)
+            .execution_options(yield_per=5000)
+        )
+        index.bulk_load(
+            (row.id, row.title, row.author, row.description, popularity(row.reads, row.votes))
+            for row in rows
+        )
+        conn.rollback()
+
+    global _typeahead
+    with _typeahead_lock:
+        _typeahead = index
+        _typeahead_state.update(built_at=time.monotonic(), last_change=last_change, synced_at=0.0)
+    # Changes committed while loading are replayed on top
+    sync_typeahead(force=True)
+
+def rebuild_typeahead_in_background():
+    # bulk_load is CPU-bound for tens of seconds on large catalogues. On a real OS
+    # thread (run_in_background) the gevent hub keeps serving requests and sending
+    # gunicorn heartbeats; a threading.Thread would only be a greenlet under gevent.
+    def rebuild():
+        with app.app_context():
+            try:
+                build_typeahead()
+            finally:
+                _typeahead_state['rebuilding'] = False
+
+    _typeahead_state['rebuilding'] = True
+    run_in_background(rebuild)
+
+def sync_typeahead(force=False):
+    """Apply StoryChange rows this worker has not seen yet (at most once a second)."""
+    now = time.monotonic()
+    if not force and now - _typeahead_state['synced_at'] < TYPEAHEAD_SYNC_SECONDS:
+        return
+    _typeahead_state['synced_at'] = now
+
+    changes = (
+        StoryChange.query
+        .filter(StoryChange.id > _typeahead_state['last_change'])
+        .order_by(StoryChange.id)
+        .all()
+    )
+    with _typeahead_lock:
+        for change in changes:
+            if change.id <= _typeahead_state['last_change']:
+                continue  # applied by a concurrent sync, or already in a rebuilt index
+            if change.story_id == TYPEAHEAD_REBUILD_MARKER:
+                if not _typeahead_state['rebuilding']:
+                    rebuild_typeahead_in_background()
+            if change.old_title is not None:
+                _typeahead.remove_story(change.story_id, change.old_title, change.old_author,
+                                        change.old_tags, change.old_score or 0)
+            if change.new_title is not None:
+                _typeahead.add_story(change.story_id, change.new_title, change.new_author,
+                                     change.new_tags, change.new_score or 0)
+            _typeahead_state['last_change'] = change.id
+
+def suggest_stories(query):
+    built_at = _typeahead_state['built_at']
+    stale = built_at is None or time.monotonic() - built_at > TYPEAHEAD_REBUILD_SECONDS
+    if stale and not _typeahead_state['rebuilding']:
+        rebuild_typeahead_in_background()
+    if built_at is None:
+        return []  # the first build is still running
+    sync_typeahead()
+
+    with _typeahead_lock:
+        return list(_typeahead.suggest(query))
+
 @app.before_request
 def load_current_user():
     g.user = session.get('username')
@@ -143,6 +1229,12 @@ def datetimeformat(value):
     except Exception:
         return str(value)
 
+@app.template_filter('minutes')
+def minutes(seconds):
+    if not seconds:
+        return "< 1 min"
+    return f"{max(round(seconds / 60), 1)} min"
+
 # Route: index redirect
 # Route: index redirect
 @app.route('/')
@@ -206,6 +1298,7 @@ def logout():
 
 # Route: home
 @app.route('/home')
+@read_only
 def home():
     if 'username' not in session:
         return redirect(url_for('login'))
@@ -220,8 +1313,10 @@ def create_tables():
 
 @app.route('/chapter_audio/<int:chapter_id>')
 def chapter_audio(chapter_id):
-    audio_path = os.path.join(AUDIO_FOLDER, f'chapter_{chapter_id}.mp3')
-    if os.path.exists(audio_path):
+    # audio_file is cleared when a failed narration is collected, until it is re-narrated
+    chapter = Chapter.query.with_entities(Chapter.audio_file).filter_by(id=chapter_id).first()
+    audio_path = os.path.join(AUDIO_FOLDER, chapter.audio_file) if chapter and chapter.audio_file else None
+    if audio_path and os.path.exists(audio_path):
         return send_file(audio_path, mimetype='audio/mpeg')
     return "Audio not available", 404
 
@@ -255,7 +1350,8 @@ def add_story():
             author=session.get('username')
         )
         db.session.add(new_story)
-        db.session.commit()
+        db.session.flush()
+        record_story_change(new_story.id, after=story_snapshot(new_story))
 
         first_chapter = Chapter(
             story_id=new_story.id,
@@ -263,8 +1359,10 @@ def add_story():
             content=chapter_content,
             author_name=session.get('username')
         )
-        db.session.add(first_chapter)
+        db.session.add(prepare_chapter(first_chapter))
         db.session.commit()
+        sync_typeahead(force=True)
+        publish_chapter(first_chapter)
 
         return redirect(url_for('upload_chapter', story_id=new_story.id))
 
@@ -310,6 +1408,7 @@ def submit_story():
         )
         db.session.add(story)
         db.session.flush()
+        record_story_change(story.id, after=story_snapshot(story))
 
         chapter = Chapter(
             story_id=story.id,
@@ -317,18 +1416,7 @@ def submit_story():
             content=chapter_content,
             author_name=session['username']
         )
-        db.session.add(chapter)
-        db.session.flush()
-
-        audio_path = os.path.join(AUDIO_FOLDER, f'chapter_{chapter.id}.mp3')
-
-        async def generate_audio():
-            communicate = edge_tts.Communicate(chapter_content, voice="en-US-GuyNeural")
-            await communicate.save(audio_path)
-
-        asyncio.run(generate_audio())
-
-        chapter.audio_file = f'chapter_{chapter.id}.mp3'
+        db.session.add(prepare_chapter(chapter))
         db.session.commit()
 
     except Exception as e:
@@ -336,13 +1424,19 @@ def submit_story():
         print("Error:", e)
         return "Internal Server Error", 500
 
+    sync_typeahead(force=True)
+    publish_chapter(chapter)
+
+    # Audio shows up once the background job finishes; failures stay in the narration backlog
+    run_in_background(narrate_chapter, chapter.id, chapter_content)
+
     return redirect(url_for('home'))
 
 # Route: read a story
 @app.route('/read/<int:story_id>', methods=['GET', 'POST'])
 def read_story(story_id):
     story = Story.query.get_or_404(story_id)
-    chapter = Chapter.query.filter_by(story_id=story_id).first()
+    chapter = Chapter.query.options(undefer(Chapter.content_html)).filter_by(story_id=story_id).first()
 
     if not chapter:
         return "No chapter found for this story", 404
@@ -377,8 +1471,9 @@ def read_story(story_id):
 
 # Route: read specific chapter
 @app.route('/chapter/<int:chapter_id>')
+@read_only
 def read_chapter(chapter_id):
-    chapter = Chapter.query.get_or_404(chapter_id)
+    chapter = Chapter.query.options(undefer(Chapter.content_html)).get_or_404(chapter_id)
     story = Story.query.get_or_404(chapter.story_id)
     next_chapter = (
         Chapter.query
@@ -394,7 +1489,9 @@ def read_chapter(chapter_id):
         chapter=chapter,
         story=story,
         comments=comments,
-        next_chapter_id=next_chapter_id
+        next_chapter_id=next_chapter_id,
+        hls_js_url=HLS_JS_URL if HLS_JS_INTEGRITY else None,
+        hls_js_integrity=HLS_JS_INTEGRITY
     )
 
 # Route: upload chapter
@@ -413,8 +1510,9 @@ def upload_chapter(story_id):
             content=chapter_content,
             author_name=session.get('username')
         )
-        db.session.add(new_chapter)
+        db.session.add(prepare_chapter(new_chapter))
         db.session.commit()
+        publish_chapter(new_chapter)
 
         return redirect(url_for('view_story', story_id=story_id))
 
@@ -477,6 +1575,7 @@ def story_detail(story_id):
     # ✅ 1. Increment read count
     story = Story.query.get_or_404(story_id)
     story.reads = (story.reads or 0) + 1
+    count_read()
     db.session.commit()
 
     # ✅ 2. Save to reading history (if logged in)
@@ -506,13 +1605,21 @@ def story_detail(story_id):
     # ✅ 4. Fetch chapters
     chapters = Chapter.query.filter_by(story_id=story_id).all()
 
+    # ✅ 5. Follow status for the story's author
+    following = False
+    if 'user_id' in session:
+        following = db.session.query(Follow.id).join(User, User.id == Follow.author_id).filter(
+            Follow.follower_id == session['user_id'], User.username == story.author
+        ).first() is not None
+
     return render_template(
         'story_detail.html',
         story=story,
         chapters=chapters,
         username=session.get('username'),
         liked=liked,
-        total_likes=total_likes
+        total_likes=total_likes,
+        following=following
     )
 
 # Route: add chapter
@@ -534,8 +1641,9 @@ def add_chapter(story_id):
             content=chapter_content,
             author_name=session.get('username')
         )
-        db.session.add(new_chapter)
+        db.session.add(prepare_chapter(new_chapter))
         db.session.commit()
+        publish_chapter(new_chapter)
 
         return redirect(url_for('story_detail', story_id=story_id))
 
@@ -547,6 +1655,7 @@ def edit_story(story_id):
     story = Story.query.get_or_404(story_id)
 
     if request.method == 'POST':
+        before = story_snapshot(story)
         story.title = request.form['title']
         story.description = request.form['description']
         story.status = request.form['status']
@@ -565,7 +1674,9 @@ def edit_story(story_id):
             # Update cover image filename in story
             story.cover_image = filename
 
+        record_story_change(story.id, before=before, after=story_snapshot(story))
         db.session.commit()
+        sync_typeahead(force=True)
         return redirect(url_for('story_detail', story_id=story.id))
 
     return render_template('edit_story.html', story=story)
@@ -604,23 +1715,28 @@ def delete_story(story_id):
     user_id = session.get('user_id')
     is_admin = session.get('is_admin', False)
 
-    if is_admin:
-        story = Story.query.get(story_id)
-    else:
-        story = Story.query.filter_by(id=story_id, author=user_id).first()
+    story_query = Story.query.with_entities(
+        Story.id, Story.title, Story.author, Story.description, Story.reads, Story.votes
+    ).filter_by(id=story_id)
+    if not is_admin:
+        story_query = story_query.filter_by(author=user_id)
 
+    story = story_query.first()
     if story is None:
         flash('Story not found or you do not have permission to delete it.')
         return redirect(url_for('admin_panel') if is_admin else url_for('home'))
 
-    db.session.delete(story)
+    record_story_change(story_id, before=story_snapshot(story))
+    delete_story_rows(story_id)
     db.session.commit()
+    sync_typeahead(force=True)
     flash('Story deleted successfully.')
 
     return redirect(url_for('admin_panel') if is_admin else url_for('home'))
 
 # Route: view story (for upload_chapter redirect)
 @app.route('/view_story/<int:story_id>')
+@read_only
 def view_story(story_id):
     story = Story.query.get_or_404(story_id)
     chapters = Chapter.query.filter_by(story_id=story_id).all()
@@ -633,10 +1749,96 @@ def admin_panel():
         flash('Admin access only.', 'error')
         return redirect(url_for('home'))
 
-    users = User.query.with_entities(User.id, User.username, User.email, User.is_admin).all()
-    stories = Story.query.with_entities(Story.id, Story.title, Story.status, Story.reads, Story.votes).all()
+    user_sorts = {'id': (User.id, int), 'username': (User.username, str)}
+    story_sorts = {
+        'id': (Story.id, int),
+        'title': (Story.title, str),
+        'reads': (Story.reads, int),
+        'votes': (Story.votes, int),
+    }
+    args = request.args.to_dict()
+
+    # ✅ Users: keyset-paginated, sortable, filterable by username prefix
+    users_query = User.query.with_entities(User.id, User.username, User.email, User.is_admin)
+    users_q = args.get('users_q', '').strip()
+    if users_q:
+        users_query = users_query.filter(prefix_filter(User.username, users_q))
+    sort_col, cast = user_sorts.get(args.get('users_sort'), user_sorts['id'])
+    users, users_next = keyset_page(
+        users_query, sort_col, User.id, cast,
+        args.get('users_dir') == 'desc', args.get('users_after')
+    )
+
+    # ✅ Stories: keyset-paginated, sortable, filterable by title prefix and status
+    stories_query = Story.query.with_entities(Story.id, Story.title, Story.status, Story.reads, Story.votes)
+    stories_q = args.get('stories_q', '').strip()
+    if stories_q:
+        stories_query = stories_query.filter(prefix_filter(Story.title, stories_q))
+    if args.get('stories_status'):
+        stories_query = stories_query.filter(Story.status == args['stories_status'])
+    sort_col, cast = story_sorts.get(args.get('stories_sort'), story_sorts['id'])
+    stories, stories_next = keyset_page(
+        stories_query, sort_col, Story.id, cast,
+        args.get('stories_dir') == 'desc', args.get('stories_after')
+    )
 
-    return render_template('admin.html', users=users, stories=stories)
+    # ✅ Dashboard: read from the precomputed rollup, never from the live tables
+    site_stats = db.session.get(SiteStats, 1)
+    top_stories = json.loads(site_stats.top_stories) if site_stats and site_stats.top_stories else []
+    daily_stats = DailyStat.query.order_by(DailyStat.day.desc()).limit(14).all()
+    captures = ProfileCapture.query.order_by(ProfileCapture.id.desc()).limit(20).all()
+
+    return render_template(
+        'admin.html',
+        users=users,
+        stories=stories,
+        users_next=users_next,
+        stories_next=stories_next,
+        args=args,
+        site_stats=site_stats,
+        top_stories=top_stories,
+        daily_stats=daily_stats,
+        captures=captures
+    )
+
+# Route: download a profile capture
+@app.route('/admin/profiles/<int:capture_id>')
+def download_profile(capture_id):
+    if not session.get('is_admin'):
+        return redirect(url_for('home'))
+
+    capture = ProfileCapture.query.options(undefer(ProfileCapture.data)).get_or_404(capture_id)
+    if capture.data is None:
+        abort(404)
+    headers = {'Content-Disposition': f'attachment; filename={capture.filename}'}
+    if 'gzip' in request.accept_encodings:
+        # Stored gzipped: the browser decompresses it while saving
+        headers['Content-Encoding'] = 'gzip'
+        return Response(capture.data, mimetype='application/json', headers=headers)
+    return Response(gzip.decompress(capture.data), mimetype='application/json', headers=headers)
+
+# Route: stream a data export
+@app.route('/admin/export')
+@read_only
+def export_data():
+    if not session.get('is_admin'):
+        return redirect(url_for('home'))
+
+    since = None
+    if request.args.get('since'):
+        try:
+            since = datetime.fromisoformat(request.args['since'])
+        except ValueError:
+            flash('Export "since" must be a date or ISO timestamp, e.g. 2026-01-31T12:00.', 'error')
+            return redirect(url_for('admin_panel'))
+    compress = request.args.get('format') == 'gz'
+
+    filename = f"reverie-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson" + ('.gz' if compress else '')
+    return Response(
+        stream_with_context(archive_chunks(export_records(since), compress)),
+        mimetype='application/gzip' if compress else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 # Route: make admin
 @app.route('/make_admin/<int:user_id>', methods=['POST'])
@@ -656,8 +1858,10 @@ def delete_user(user_id):
     if not session.get('is_admin'):
         return redirect(url_for('home'))
 
-    user = User.query.get_or_404(user_id)
-    db.session.delete(user)
+    if User.query.with_entities(User.id).filter_by(id=user_id).first() is None:
+        abort(404)
+
+    delete_user_rows(user_id)
     db.session.commit()
 
     return redirect(url_for('admin_panel'))
@@ -677,28 +1881,57 @@ def like_story(story_id):
 
     if not existing_like:
         db.session.execute(
-            text("INSERT INTO likes (user_id, story_id) VALUES (:uid, :sid)"),
-            {"uid": user_id, "sid": story_id}
+            text("INSERT INTO likes (user_id, story_id, created_at) VALUES (:uid, :sid, :now)"),
+            {"uid": user_id, "sid": story_id, "now": datetime.utcnow()}
         )
         db.session.execute(
-            text("UPDATE stories SET votes = votes + 1 WHERE id = :sid"),
-            {"sid": story_id}
+            text("UPDATE stories SET votes = votes + 1, updated_at = :now WHERE id = :sid"),
+            {"sid": story_id, "now": datetime.utcnow()}
         )
         db.session.commit()
 
     return redirect(url_for('story_detail', story_id=story_id))
 
+# Route: follow / unfollow an author
+@app.route('/follow/<username>', methods=['POST'])
+def toggle_follow(username):
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+
+    user_id = session['user_id']
+    author = User.query.filter_by(username=username).first_or_404()
+    if author.id != user_id:
+        existing = Follow.query.filter_by(follower_id=user_id, author_id=author.id).first()
+        if existing:
+            unfollow_author(user_id, author)
+        else:
+            follow_author(user_id, author)
+        db.session.commit()
+
+    return redirect(request.referrer or url_for('feed'))
+
+# Route: chapters from followed authors
+@app.route('/feed')
+@read_only
+def feed():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+
+    before = request.args.get('before', type=int)
+    chapters, next_before = feed_chapters(session['user_id'], before)
+    return render_template('feed.html', chapters=chapters, next_before=next_before)
+
 # Route: user history
 @app.route('/history')
+@read_only
 def view_history():
     if 'user_id' not in session:
         return redirect(url_for('login'))
 
     user_id = session['user_id']
-    db_session = Session(db.engine)
 
     history = (
-        db_session.query(History)
+        db.session.query(History)
         .join(Story, History.story_id == Story.id)
         .filter(History.user_id == user_id)
         .order_by(desc(History.viewed_at))
@@ -706,7 +1939,6 @@ def view_history():
         .all()
     )
 
-    db_session.close()
     return render_template('history.html', history=history)
 
 # Route: remove from history
@@ -728,15 +1960,16 @@ def remove_from_history(story_id):
 
 # Route: search stories
 @app.route('/search')
+@read_only
 def search():
     query = request.args.get('q', '').strip().lower()
-    db_session = Session(db.engine)
 
     # Search normally and also match hashtags like #bts
-    results = db_session.execute(
+    results = db.session.execute(
         text("""
             SELECT * FROM stories 
             WHERE LOWER(title) LIKE :q 
+               OR LOWER(author) LIKE :q
                OR LOWER(description) LIKE :q 
                OR LOWER(description) LIKE :hashtag
         """),
@@ -746,9 +1979,22 @@ def search():
         }
     ).fetchall()
 
-    db_session.close()
     return render_template('search_results.html', query=query, results=results)
 
+# Route: search suggestions (as-you-type)
+@app.route('/suggest')
+@read_only
+def suggest():
+    query = request.args.get('q', '')
+    suggestions = []
+    for item in suggest_stories(query):
+        if item['type'] == 'story':
+            url = url_for('story_detail', story_id=item['id'])
+        else:
+            url = url_for('search', q=item['label'].lstrip('#'))
+        suggestions.append({'type': item['type'], 'label': item['label'], 'url': url})
+    return jsonify(suggestions)
+
 # Route: set theme
 @app.route('/set_theme', methods=['POST'])
 def set_theme():
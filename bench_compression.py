@@ -0,0 +1,86 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from app import app, db, zstandard, decompress_text
+from sqlalchemy import text
+
+# Compares plain TEXT storage with the CompressedText codecs on a copy of the chapter
+# corpus (or generated prose when the configured DB has few chapters).
+# Usage: python bench_compression.py [rows]
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+READS = 2000
+WORDS = (
+    "the moon whispered over silver rivers while she waited by the old gate and "
+    "his voice trembled as the stars fell into the quiet garden where memories slept "
+    "they ran through the forest of glass under a crimson sky and never looked back"
+).split()
+
+def load_corpus():
+    with app.app_context():
+        rows = db.session.execute(text("SELECT content FROM chapters LIMIT :n"), {"n": ROWS}).fetchall()
+        chapters = [decompress_text(row.content) for row in rows if row.content]
+    rng = random.Random(42)
+    while len(chapters) < ROWS:
+        paragraphs = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))).capitalize() + '.'
+            for _ in range(rng.randint(15, 40))
+        ]
+        chapters.append('\n\n'.join(paragraphs))
+    return chapters[:ROWS]
+
+def make_codecs(corpus):
+    codecs = {
+        'plain': (lambda s: s, lambda v: v),
+        'zlib': (lambda s: zlib.compress(s.encode('utf-8'), 9), lambda v: zlib.decompress(v).decode('utf-8')),
+    }
+    if zstandard:
+        c, d = zstandard.ZstdCompressor(level=9), zstandard.ZstdDecompressor()
+        codecs['zstd'] = (lambda s: c.compress(s.encode('utf-8')), lambda v: d.decompress(v).decode('utf-8'))
+        samples = [s.encode('utf-8') for s in corpus[:500]]
+        trained = zstandard.train_dictionary(112640, samples)
+        cd = zstandard.ZstdCompressor(level=9, dict_data=trained)
+        dd = zstandard.ZstdDecompressor(dict_data=trained)
+        codecs['zstd+dict'] = (lambda s: cd.compress(s.encode('utf-8')), lambda v: dd.decompress(v).decode('utf-8'))
+    return codecs
+
+def bench(name, encode, decode, corpus, workdir):
+    path = os.path.join(workdir, f'{name}.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE chapters (id INTEGER PRIMARY KEY, content BLOB)")
+
+    cpu = time.process_time()
+    conn.executemany("INSERT INTO chapters (id, content) VALUES (?, ?)",
+                     ((i, encode(s)) for i, s in enumerate(corpus, 1)))
+    conn.commit()
+    write_cpu = time.process_time() - cpu
+    conn.execute("VACUUM")
+
+    rng = random.Random(7)
+    ids = [rng.randint(1, len(corpus)) for _ in range(READS)]
+    wall, cpu = time.perf_counter(), time.process_time()
+    for chapter_id in ids:
+        value, = conn.execute("SELECT content FROM chapters WHERE id = ?", (chapter_id,)).fetchone()
+        decode(value)
+    read_wall = (time.perf_counter() - wall) / READS
+    read_cpu = (time.process_time() - cpu) / READS
+    conn.close()
+
+    return os.path.getsize(path), write_cpu, read_wall, read_cpu
+
+if __name__ == '__main__':
+    corpus = load_corpus()
+    raw_bytes = sum(len(s.encode('utf-8')) for s in corpus)
+    print(f"📚 {len(corpus)} chapters, {raw_bytes / 1048576:.1f} MB of text, {READS} random reads\n")
+    print(f"{'codec':<10} {'db size':>10} {'ratio':>7} {'write cpu':>10} {'read µs':>9} {'read cpu µs':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = None
+        for name, (encode, decode) in make_codecs(corpus).items():
+            size, write_cpu, read_wall, read_cpu = bench(name, encode, decode, corpus, workdir)
+            baseline = baseline or size
+            print(f"{name:<10} {size / 1048576:>8.1f}MB {baseline / size:>6.2f}x "
+                  f"{write_cpu:>9.2f}s {read_wall * 1e6:>9.1f} {read_cpu * 1e6:>12.1f}")
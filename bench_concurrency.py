@@ -0,0 +1,98 @@
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Starts gunicorn in each serving mode and measures how many concurrent readers it
+# sustains on /chapter/<id>. Uses DATABASE_URL if set (point it at a staging Postgres
+# for realistic numbers), otherwise a throwaway SQLite DB seeded with chapters.
+# Usage: python bench_concurrency.py [seconds per run]
+
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+MODES = ['sync', 'gthread', 'gevent']
+CONCURRENCY = [10, 50, 200]
+PORT = 8765
+
+def seed(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    script = (
+        "from app import app, db, Story, Chapter\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        "    if not Chapter.query.first():\n"
+        "        story = Story(title='Bench', author='bench'); db.session.add(story); db.session.flush()\n"
+        "        for i in range(200):\n"
+        "            db.session.add(Chapter(story_id=story.id, title=f'Chapter {i}', content='Once upon a time. ' * 400, author_name='bench'))\n"
+        "        db.session.commit()\n"
+        "    print(' '.join(str(c.id) for c in Chapter.query.with_entities(Chapter.id).limit(200)))\n"
+    )
+    out = subprocess.run([sys.executable, '-c', script], env=env, check=True, capture_output=True, text=True)
+    return [int(i) for i in out.stdout.split()]
+
+def wait_until_up():
+    for _ in range(100):
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=1)
+            conn.request('GET', '/login')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not start')
+
+def load(chapter_ids, concurrency):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + DURATION
+    lock = threading.Lock()
+
+    def reader():
+        rng = random.Random()
+        conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', f'/chapter/{rng.choice(chapter_ids)}')
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+                ok = False
+            with lock:
+                (latencies if ok else errors).append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=reader) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    p = lambda q: latencies[int(len(latencies) * q)] * 1000 if latencies else float('nan')
+    return len(latencies) / DURATION, p(0.5), p(0.95), len(errors)
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        chapter_ids = seed(database_url)
+
+        print(f"{'mode':<8} {'readers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for mode in MODES:
+            env = dict(os.environ, DATABASE_URL=database_url, WEB_WORKER_CLASS=mode, PORT=str(PORT))
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                wait_until_up()
+                for concurrency in CONCURRENCY:
+                    rps, p50, p95, errors = load(chapter_ids, concurrency)
+                    print(f"{mode:<8} {concurrency:>7} {rps:>8.0f} {p50:>8.1f} {p95:>8.1f} {errors:>7}")
+            finally:
+                server.terminate()
+                server.wait()
@@ -0,0 +1,70 @@
+import random
+import sys
+import time
+import tracemalloc
+from typeahead import PrefixIndex
+
+# Builds the typeahead index over a synthetic catalogue and reports build time, memory
+# and per-query latency for 1-6 character prefixes.
+# Usage: python bench_typeahead.py [stories]
+
+STORIES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+QUERIES = 20000
+WORDS = (
+    "moon sun star love dark night dream shadow blood silver crimson secret lost "
+    "heart fire rain winter summer kingdom prince queen wolf ghost city garden"
+).split()
+TAGS = ['bts', 'army', 'romance', 'fantasy', 'horror', 'enhypen', 'sunghoon', 'yeonjun', 'txt', 'angst']
+
+def catalogue(rng):
+    for story_id in range(1, STORIES + 1):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) + f' {story_id}'
+        author = f'author{rng.randint(1, STORIES // 20)}'
+        description = ' '.join(f'#{tag}' for tag in rng.sample(TAGS, rng.randint(0, 3)))
+        yield story_id, title.title(), author, description, int(rng.paretovariate(1.2) * 10)
+
+if __name__ == '__main__':
+    rng = random.Random(1)
+    stories = list(catalogue(rng))
+    start = time.perf_counter()
+    index = PrefixIndex()
+    index.bulk_load(stories)
+    build = time.perf_counter() - start
+
+    # Memory is measured on a second build because tracing slows it down several times
+    del stories
+    tracemalloc.start()
+    measured = PrefixIndex()
+    measured.bulk_load(catalogue(random.Random(1)))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+    print(f"📚 {STORIES} stories, {len(index)} keys, built in {build:.1f}s, "
+          f"{current / 1048576:.0f} MB held ({peak / 1048576:.0f} MB peak while building)\n")
+
+    print(f"{'prefix':>6} {'p50 µs':>8} {'p99 µs':>8} {'max µs':>8}")
+    for length in range(1, 7):
+        samples = []
+        for _ in range(QUERIES // 6):
+            word = rng.choice(WORDS + [f'author{rng.randint(1, 999)}'] + TAGS)
+            prefix = word[:length]
+            t = time.perf_counter()
+            index.suggest(prefix)
+            samples.append((time.perf_counter() - t) * 1e6)
+        samples.sort()
+        print(f"{length:>6} {samples[len(samples) // 2]:>8.1f} {samples[int(len(samples) * 0.99)]:>8.1f} {samples[-1]:>8.1f}")
+
+    start = time.perf_counter()
+    for story_id in range(STORIES + 1, STORIES + 1001):
+        index.add_story(story_id, f'Moon Saga {story_id}', 'author1', '#bts', 50)
+    print(f"\n✏️ add_story: {(time.perf_counter() - start):.2f} ms per story")
+
+    # A write must not push short prefixes of its author or hashtags back to a full scan
+    worst = 0.0
+    for story_id in range(STORIES + 1001, STORIES + 1101):
+        index.add_story(story_id, f'Ghost Tale {story_id}', 'author1', '#bts #army', 5)
+        for prefix in ('a', 'au', 'b', 'g'):
+            t = time.perf_counter()
+            index.suggest(prefix)
+            worst = max(worst, (time.perf_counter() - t) * 1e6)
+    print(f"⚡ first lookup after a write: {worst:.1f} µs worst case")
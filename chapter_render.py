@@ -0,0 +1,28 @@
+import re
+from markupsafe import escape
+
+# Write-time processing for chapter text. Runs once when a chapter is saved so the
+# reader pages only output stored HTML and story pages can show lengths without
+# loading the prose.
+
+READING_WPM = 230  # typical silent reading speed for fiction
+LISTENING_WPM = 150  # edge_tts narration pace at the default rate
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+WORD = re.compile(r"\w+(?:['’]\w+)*")
+
+def render_chapter(text):
+    """Return (html, word_count, reading_seconds, listening_seconds) for chapter text.
+
+    The text is HTML-escaped, split into paragraphs on blank lines and each paragraph
+    gets an id (p1, p2, ...) so readers can link to or resume at a paragraph.
+    """
+    text = (text or '').replace('\r\n', '\n').replace('\r', '\n').strip()
+    paragraphs = [p.strip() for p in PARAGRAPH_BREAK.split(text) if p.strip()]
+
+    html = '\n'.join(
+        f'<p id="p{n}" class="paragraph">{str(escape(paragraph)).replace(chr(10), "<br>")}</p>'
+        for n, paragraph in enumerate(paragraphs, 1)
+    )
+    words = len(WORD.findall(text))
+    return html, words, round(words * 60 / READING_WPM), round(words * 60 / LISTENING_WPM)
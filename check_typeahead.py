@@ -0,0 +1,76 @@
+import random
+import sys
+import typeahead
+from typeahead import PrefixIndex, hashtags, normalize, STORY, AUTHOR, TAG
+
+# Randomized check of the typeahead index against a brute-force model: random adds,
+# removes, rescores and replayed (duplicate) changes, then every short prefix is
+# compared with the exact top k recomputed from scratch. SCAN_LIMIT is lowered so
+# most prefixes go through the patched cache.
+# Usage: python check_typeahead.py [rounds]
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+WORDS = 'moon mood sun star dark dawn rain rose wolf'.split()
+AUTHORS = ['ana', 'anna', 'bo', 'bora']
+TAGS = ['bts', 'btob', 'army', 'angst']
+
+def random_story(rng, story_id):
+    title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 2)))
+    description = ' '.join(f'#{tag}' for tag in rng.sample(TAGS, rng.randint(0, 2)))
+    return story_id, title, rng.choice(AUTHORS), description, rng.randint(0, 50)
+
+def expected(stories, prefix, k):
+    """Scores of the exact top k for `prefix`, plus every entry's score by identity."""
+    entries = {}
+    for story_id, title, author, description, score in stories.values():
+        if normalize(title):
+            entries[(STORY, story_id)] = (normalize(title), score)
+        labels = [(TAG, f'#{tag}', tag) for tag in hashtags(description)]
+        labels.append((AUTHOR, author, author))
+        for kind, label, key in labels:
+            _, total = entries.get((kind, label), (None, 0))
+            entries[(kind, label)] = (normalize(key), total + score)
+    matching = {identity: score for identity, (key, score) in entries.items() if key.startswith(prefix)}
+    return sorted(matching.values(), reverse=True)[:k], matching
+
+def check(index, stories):
+    for prefix in {word[:n] for word in WORDS + AUTHORS + TAGS for n in (1, 2, 3)}:
+        top, scores = expected(stories, prefix, index.k)
+        results = index.suggest(prefix)
+        assert [r['score'] for r in results] == top, (prefix, results, top)
+        for r in results:
+            identity = (r['type'], r['id'] if r['type'] == STORY else r['label'])
+            assert scores.get(identity) == r['score'], (prefix, r)
+
+def run(seed):
+    rng = random.Random(seed)
+    stories = {story_id: random_story(rng, story_id) for story_id in range(1, 40)}
+    index = PrefixIndex(k=3)
+    index.bulk_load(stories.values())
+    next_id = 40
+    for _ in range(60):
+        action = rng.random()
+        if action < 0.3 or not stories:
+            story = random_story(rng, next_id)
+            next_id += 1
+            stories[story[0]] = story
+            index.add_story(*story)
+            index.add_story(*story)  # replayed change
+        elif action < 0.5:
+            story = stories.pop(rng.choice(list(stories)))
+            index.remove_story(*story)
+            index.remove_story(*story)
+        else:
+            # An edit: new score, sometimes a new title, author or hashtags
+            old = stories[rng.choice(list(stories))]
+            new = random_story(rng, old[0]) if rng.random() < 0.3 else (*old[:4], rng.randint(0, 50))
+            index.remove_story(*old)
+            index.add_story(*new)
+            stories[old[0]] = new
+        check(index, stories)
+
+if __name__ == '__main__':
+    typeahead.SCAN_LIMIT = 4
+    for seed in range(ROUNDS):
+        run(seed)
+    print(f"✅ {ROUNDS} randomized runs match the brute-force top k.")
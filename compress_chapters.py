@@ -0,0 +1,135 @@
+import sys
+from app import (
+    app, db, zstandard, CompressionDict,
+    compress_text, decompress_text, is_compressed
+)
+from sqlalchemy import inspect, text
+
+# Converts chapters.content to compressed storage, in batches.
+#
+# On PostgreSQL this must run BEFORE the code that writes compressed chapters is
+# deployed: the app binds bytea, which a text column rejects. The column is swapped
+# without rewriting the table under a lock:
+#   1. add chapters.content_bytes (bytea, nullable: no table rewrite)
+#   2. backfill it in batches while the site keeps running
+#   3. under a short write lock, fill rows added meanwhile and swap the column names
+#   4. drop the old text column (metadata only on PostgreSQL)
+# Running it again resumes where it stopped. On SQLite columns take any type, so only
+# the batched compression pass runs.
+#
+# --train-dict trains a zstd dictionary from recent chapters and stores it in the
+# compression_dicts table; new chapters use the newest dictionary after a restart.
+
+DICT_SIZE = 112640  # 110 KB, zstd's default dictionary size
+DICT_SAMPLES = 2000
+STAGING_COLUMN = 'content_bytes'
+
+def _column_types():
+    return {col['name']: str(col['type']).upper() for col in inspect(db.engine).get_columns('chapters')}
+
+def _fill_staging_column(conn, last_id, batch_size):
+    rows = conn.execute(
+        text(f"SELECT id, content FROM chapters WHERE id > :last AND {STAGING_COLUMN} IS NULL "
+             "ORDER BY id LIMIT :n"),
+        {"last": last_id, "n": batch_size}
+    ).fetchall()
+    if rows:
+        conn.execute(
+            text(f"UPDATE chapters SET {STAGING_COLUMN} = :content WHERE id = :id"),
+            [{"id": row.id, "content": compress_text(decompress_text(row.content))} for row in rows]
+        )
+    return rows
+
+def stage_bytea_column(batch_size=200):
+    # PostgreSQL needs bytea for compressed rows; SQLite stores blobs in any column
+    if db.engine.dialect.name != 'postgresql':
+        return
+    columns = _column_types()
+    if columns['content'] == 'BYTEA':
+        if STAGING_COLUMN in columns:
+            with db.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE chapters DROP COLUMN {STAGING_COLUMN}"))
+        return
+
+    if STAGING_COLUMN not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE chapters ADD COLUMN {STAGING_COLUMN} BYTEA"))
+        print(f"✅ Column '{STAGING_COLUMN}' added.")
+
+    last_id, staged = 0, 0
+    while True:
+        with db.engine.begin() as conn:
+            rows = _fill_staging_column(conn, last_id, batch_size)
+        if not rows:
+            break
+        staged += len(rows)
+        last_id = rows[-1].id
+        print(f"… up to chapter {last_id}, {staged} staged so far")
+
+    with db.engine.begin() as conn:
+        # Blocks writes (not reads) for the catch-up and the rename only
+        conn.execute(text("LOCK TABLE chapters IN EXCLUSIVE MODE"))
+        last_id = 0
+        while True:
+            rows = _fill_staging_column(conn, last_id, batch_size)
+            if not rows:
+                break
+            last_id = rows[-1].id
+        conn.execute(text("ALTER TABLE chapters RENAME COLUMN content TO content_text"))
+        conn.execute(text(f"ALTER TABLE chapters RENAME COLUMN {STAGING_COLUMN} TO content"))
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE chapters DROP COLUMN content_text"))
+    print("✅ chapters.content is now compressed BYTEA.")
+
+def train_dictionary():
+    if zstandard is None:
+        print("❌ Install the zstandard package to train a dictionary.")
+        return
+
+    with app.app_context():
+        db.create_all()  # compression_dicts on databases that predate it
+        rows = db.session.execute(
+            text("SELECT content FROM chapters ORDER BY id DESC LIMIT :n"),
+            {"n": DICT_SAMPLES}
+        ).fetchall()
+        samples = [decompress_text(row.content).encode('utf-8') for row in rows if row.content]
+        dictionary = zstandard.train_dictionary(DICT_SIZE, samples)
+        # Older dictionaries stay: rows compressed with them still name them by id
+        db.session.add(CompressionDict(id=dictionary.dict_id(), data=dictionary.as_bytes()))
+        db.session.commit()
+    print(f"✅ Trained dictionary {dictionary.dict_id()} ({len(dictionary.as_bytes())} bytes) "
+          f"from {len(samples)} chapters. Restart the workers to start using it.")
+
+def compress_chapters(batch_size=200):
+    with app.app_context():
+        stage_bytea_column(batch_size)
+
+        last_id, converted = 0, 0
+        while True:
+            rows = db.session.execute(
+                text("SELECT id, content FROM chapters WHERE id > :last ORDER BY id LIMIT :n"),
+                {"last": last_id, "n": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+
+            updates = [
+                {"id": row.id, "content": compress_text(decompress_text(row.content))}
+                for row in rows
+                if row.content is not None and not is_compressed(row.content)
+            ]
+            if updates:
+                db.session.execute(text("UPDATE chapters SET content = :content WHERE id = :id"), updates)
+            db.session.commit()
+
+            converted += len(updates)
+            last_id = rows[-1].id
+            print(f"… up to chapter {last_id}, {converted} compressed so far")
+
+        print(f"✅ Compressed {converted} chapter(s).")
+
+if __name__ == '__main__':
+    if '--train-dict' in sys.argv:
+        train_dictionary()
+    else:
+        compress_chapters()
@@ -0,0 +1,62 @@
+import gzip
+import json
+import sys
+from datetime import datetime
+from app import app, archive_chunks, export_records, import_records
+
+# Streams the database to an NDJSON archive and loads it back, e.g. to back up the
+# Postgres deployment or seed a staging database:
+#
+#   python data_archive.py export backup.ndjson.gz
+#   python data_archive.py export --since 2026-01-31 changes.ndjson
+#   python data_archive.py import backup.ndjson.gz
+#
+# A .gz file name writes a gzipped archive; import detects gzip on its own.
+# Export to "-" (or no file) writes to stdout.
+
+USAGE = "usage: python data_archive.py export [--since TIMESTAMP] [FILE] | import FILE"
+
+def export_archive(path=None, since=None):
+    compress = bool(path) and path.endswith('.gz')
+    out = open(path, 'wb') if path and path != '-' else sys.stdout.buffer
+    try:
+        with app.app_context():
+            for chunk in archive_chunks(export_records(since), compress):
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    if out is not sys.stdout.buffer:
+        print(f"✅ Exported to {path}.", file=sys.stderr)
+
+def read_archive(path):
+    with open(path, 'rb') as f:
+        gzipped = f.read(2) == b'\x1f\x8b'
+    with (gzip.open(path, 'rt', encoding='utf-8') if gzipped else open(path, encoding='utf-8')) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def import_archive(path):
+    with app.app_context():
+        counts, conflicts = import_records(read_archive(path))
+    for kind, count in counts.items():
+        print(f"✅ {count} {kind} row(s) imported.")
+    for conflict in conflicts:
+        print(f"ℹ️ User {conflict['id']} ({conflict['username']}) not imported: the username "
+              f"belongs to user {conflict['existing_id']} here, which gets its likes, history and follows.")
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['export']:
+        since = None
+        if '--since' in args:
+            at = args.index('--since')
+            since = datetime.fromisoformat(args[at + 1])
+            del args[at:at + 2]
+        export_archive(args[1] if len(args) > 1 else None, since)
+    elif args[:1] == ['import'] and len(args) == 2:
+        import_archive(args[1])
+    else:
+        print(USAGE)
+        sys.exit(1)
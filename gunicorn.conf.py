@@ -0,0 +1,40 @@
+import os
+
+# Serving modes (pick with WEB_WORKER_CLASS):
+#
+#   gevent (default)  Each worker handles up to WEB_WORKER_CONNECTIONS requests at once;
+#                     a request waiting on PostgreSQL, disk or the network yields to the
+#                     others instead of holding the whole worker. psycopg2 is made
+#                     cooperative below. Raise DB_POOL_SIZE / DB_MAX_OVERFLOW so busy
+#                     workers do not queue on the connection pool, keeping
+#                     WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) under the
+#                     database's max_connections.
+#   gthread           WEB_THREADS OS threads per worker, no monkey-patching.
+#   sync              The old behaviour: one request per worker.
+#
+# Compare the modes with `python bench_concurrency.py`.
+
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_connections = int(os.environ.get('WEB_WORKER_CONNECTIONS', 200))
+threads = int(os.environ.get('WEB_THREADS', 8))
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+keepalive = 5
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # Make psycopg2 wait on the gevent hub instead of blocking the worker
+        try:
+            import psycopg2  # noqa: F401  (not installed for SQLite-only setups)
+        except ImportError:
+            return
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+def post_worker_init(worker):
+    # Start building the search typeahead index. It runs on a background OS thread
+    # because a large catalogue takes longer than `timeout`; /suggest returns no
+    # suggestions until it is ready.
+    from app import rebuild_typeahead_in_background
+    rebuild_typeahead_in_background()
@@ -0,0 +1,19 @@
+import base64
+import hashlib
+import urllib.request
+from app import HLS_JS_URL
+
+# Prints the Subresource Integrity hash of the pinned hls.js build. Set it as
+# HLS_JS_INTEGRITY (e.g. `heroku config:set HLS_JS_INTEGRITY=sha384-...`) and the reader
+# page loads hls.js from HLS_JS_URL; the browser refuses the script if the CDN ever
+# serves different bytes. Bump the version in HLS_JS_URL, rerun and update the config.
+
+def hls_js_integrity():
+    with urllib.request.urlopen(HLS_JS_URL) as response:
+        data = response.read()
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+if __name__ == '__main__':
+    integrity = hls_js_integrity()
+    print(f"✅ {HLS_JS_URL}")
+    print(f"HLS_JS_INTEGRITY={integrity}")
@@ -0,0 +1,148 @@
+import os
+import re
+import shutil
+import sys
+import time
+from app import app, db, Chapter, Story, AUDIO_FOLDER, UPLOAD_FOLDER
+from narration_stream import HLS_FOLDER
+from sqlalchemy import update
+
+AUDIO_NAME = re.compile(r'^chapter_(\d+)\.mp3$')
+STREAM_NAME = re.compile(r'^chapter_(\d+)$')
+KEEP_COVERS = {'default.jpg'}  # referenced directly from templates
+# Files younger than this are left alone: covers are saved before their story row is
+# committed, and narrations are written in the background before audio_file is set
+MIN_AGE_SECONDS = 3600
+
+def _batches(folder, batch_size):
+    batch = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file():
+                batch.append(entry)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+def _dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+def _remove(entry, dry_run):
+    size = entry.stat().st_size
+    if not dry_run:
+        os.remove(entry.path)
+    return size
+
+def collect_audio(batch_size=500, dry_run=False):
+    removed, reclaimed = 0, 0
+    cutoff = time.time() - MIN_AGE_SECONDS
+    for batch in _batches(AUDIO_FOLDER, batch_size):
+        by_id = {}
+        for entry in batch:
+            match = AUDIO_NAME.match(entry.name)
+            # A zero-byte file may be a narration edge_tts is still streaming into
+            if match and entry.stat().st_mtime < cutoff:
+                by_id[int(match.group(1))] = entry
+
+        existing = {
+            row.id for row in
+            Chapter.query.with_entities(Chapter.id).filter(Chapter.id.in_(by_id)).all()
+        }
+        empty_ids = []
+        for chapter_id, entry in by_id.items():
+            if chapter_id in existing and entry.stat().st_size > 0:
+                continue
+            if chapter_id in existing:
+                # Failed narration: drop the file and put the chapter back in the backlog,
+                # which rollup_stats.py narrates
+                empty_ids.append(chapter_id)
+            reclaimed += _remove(entry, dry_run)
+            removed += 1
+
+        if empty_ids and not dry_run:
+            db.session.execute(
+                update(Chapter).where(Chapter.id.in_(empty_ids)).values(audio_file=None, audio_stream=None),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+    return removed, reclaimed
+
+def collect_streams(batch_size=500, dry_run=False):
+    # HLS packages live in one directory per chapter; leftover temp dirs are from crashed jobs
+    removed, reclaimed = 0, 0
+    if not os.path.isdir(HLS_FOLDER):
+        return removed, reclaimed
+    cutoff = time.time() - MIN_AGE_SECONDS
+
+    with os.scandir(HLS_FOLDER) as entries:
+        dirs = [entry for entry in entries if entry.is_dir()]
+    for start in range(0, len(dirs), batch_size):
+        by_id, orphans = {}, []
+        for entry in dirs[start:start + batch_size]:
+            match = STREAM_NAME.match(entry.name)
+            if entry.stat().st_mtime > cutoff:
+                continue
+            if match:
+                by_id[int(match.group(1))] = entry
+            elif entry.name.startswith('.chapter_'):
+                orphans.append(entry)
+
+        existing = {
+            row.id for row in
+            Chapter.query.with_entities(Chapter.id).filter(Chapter.id.in_(by_id)).all()
+        }
+        orphans += [entry for chapter_id, entry in by_id.items() if chapter_id not in existing]
+        for entry in orphans:
+            reclaimed += _dir_size(entry.path)
+            removed += 1
+            if not dry_run:
+                shutil.rmtree(entry.path)
+    return removed, reclaimed
+
+def collect_covers(batch_size=500, dry_run=False):
+    removed, reclaimed = 0, 0
+    cutoff = time.time() - MIN_AGE_SECONDS
+    for batch in _batches(UPLOAD_FOLDER, batch_size):
+        names = [entry.name for entry in batch]
+        referenced = {
+            row.cover_image for row in
+            Story.query.with_entities(Story.cover_image).filter(Story.cover_image.in_(names)).all()
+        }
+        empty = []
+        for entry in batch:
+            if entry.name in KEEP_COVERS or entry.stat().st_mtime > cutoff:
+                continue
+            if entry.name in referenced and entry.stat().st_size > 0:
+                continue
+            if entry.name in referenced:
+                empty.append(entry.name)  # broken upload: the story falls back to the default cover
+            reclaimed += _remove(entry, dry_run)
+            removed += 1
+
+        if empty and not dry_run:
+            db.session.execute(
+                update(Story).where(Story.cover_image.in_(empty)).values(cover_image=None),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+    return removed, reclaimed
+
+def collect_orphaned_media(batch_size=500, dry_run=False):
+    """Remove narration and cover files that no DB row points at, plus zero-byte files."""
+    with app.app_context():
+        audio = collect_audio(batch_size, dry_run)
+        streams = collect_streams(batch_size, dry_run)
+        covers = collect_covers(batch_size, dry_run)
+    return {'audio file(s)': audio, 'audio stream(s)': streams, 'cover(s)': covers}
+
+if __name__ == '__main__':
+    dry_run = '--dry-run' in sys.argv
+    report = collect_orphaned_media(dry_run=dry_run)
+    verb = 'Would remove' if dry_run else 'Removed'
+    for label, (count, size) in report.items():
+        print(f"🧹 {verb} {count} {label}, {size / 1024:.1f} KB reclaimed.")
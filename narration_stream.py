@@ -0,0 +1,138 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Packages a chapter narration into an HLS-style stream:
+#
+#   static/audios/hls/chapter_<id>/master.m3u8   variants, picked by the player on bandwidth
+#   static/audios/hls/chapter_<id>/opus/         ~24 kbps Opus in fMP4 segments
+#   static/audios/hls/chapter_<id>/low/          ~32 kbps MP3 in MPEG-TS segments
+#   static/audios/hls/chapter_<id>/original/     the edge_tts MP3, segmented without re-encoding
+#
+# ffmpeg is a deploy requirement: on Heroku the apt buildpack installs it from the
+# Aptfile (`heroku buildpacks:add --index 1 heroku-community/apt`), elsewhere install
+# the distribution package or point FFMPEG_BINARY at a static build. Without ffmpeg,
+# or when neither compact variant could be encoded, no stream is published and the
+# reader keeps the plain MP3.
+
+HLS_FOLDER = os.path.join('static', 'audios', 'hls')
+SEGMENT_SECONDS = 6
+FFMPEG = os.environ.get('FFMPEG_BINARY') or shutil.which('ffmpeg')
+
+# (name, ffmpeg audio args, segment type, advertised bandwidth in bits/s, CODECS)
+VARIANTS = [
+    ('opus', ['-ac', '1', '-c:a', 'libopus', '-b:a', '24k'], 'fmp4', 30000, 'opus'),
+    ('low', ['-ac', '1', '-ar', '16000', '-c:a', 'libmp3lame', '-b:a', '32k'], 'mpegts', 40000, 'mp4a.40.34'),
+    ('original', ['-c:a', 'copy'], 'mpegts', 64000, 'mp4a.40.34'),
+]
+
+COMPACT_VARIANTS = {'opus', 'low'}
+
+def stream_dir(chapter_id):
+    return os.path.join(HLS_FOLDER, f'chapter_{chapter_id}')
+
+def master_playlist_path(chapter_id):
+    # Relative to static/, as stored in Chapter.audio_stream
+    return f'audios/hls/chapter_{chapter_id}/master.m3u8'
+
+def _write_master(out_dir, variants):
+    lines = ['#EXTM3U']
+    for name, bandwidth, codecs in variants:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},CODECS="{codecs}"')
+        lines.append(f'{name}/index.m3u8')
+    with open(os.path.join(out_dir, 'master.m3u8'), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def _is_wav(source):
+    # Some older narrations are WAV files saved under an .mp3 name
+    with open(source, 'rb') as f:
+        return f.read(4) == b'RIFF'
+
+def _package_with_ffmpeg(source, out_dir):
+    written = []
+    wav = _is_wav(source)
+    for name, audio_args, segment_type, bandwidth, codecs in VARIANTS:
+        if wav and name == 'original':
+            continue  # PCM cannot be stream-copied into a playable segment
+        variant_dir = os.path.join(out_dir, name)
+        os.makedirs(variant_dir)
+        ext = 'm4s' if segment_type == 'fmp4' else 'ts'
+        command = [
+            FFMPEG, '-nostdin', '-loglevel', 'error', '-y', '-i', source, '-vn', *audio_args,
+            '-f', 'hls', '-hls_time', str(SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+            '-hls_segment_type', segment_type,
+            '-hls_segment_filename', os.path.join(variant_dir, f'seg_%03d.{ext}'),
+        ]
+        if segment_type == 'fmp4':
+            command += ['-hls_fmp4_init_filename', 'init.mp4']
+        command.append(os.path.join(variant_dir, 'index.m3u8'))
+
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            # e.g. an encoder missing from this ffmpeg build; the other variants still work
+            shutil.rmtree(variant_dir)
+            continue
+        written.append((name, bandwidth, codecs))
+    return written
+
+def package_narration(chapter_id, source):
+    """Build the HLS variants for `source` and return the master playlist path, or None."""
+    if not os.path.exists(source) or os.path.getsize(source) == 0:
+        return None
+
+    os.makedirs(HLS_FOLDER, exist_ok=True)
+    # Build next to the final location, then swap in, so readers never see half a stream
+    work_dir = tempfile.mkdtemp(prefix=f'.chapter_{chapter_id}_', dir=HLS_FOLDER)
+    try:
+        if not FFMPEG:
+            return None
+        variants = _package_with_ffmpeg(source, work_dir)
+        if not any(name in COMPACT_VARIANTS for name, _, _ in variants):
+            return None  # the original alone saves no bandwidth over the plain MP3
+        _write_master(work_dir, variants)
+        # mkdtemp creates the directory 0700; static servers and CDNs must be able to read it
+        os.chmod(work_dir, 0o755)
+
+        final_dir = stream_dir(chapter_id)
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir)
+        os.rename(work_dir, final_dir)
+        return master_playlist_path(chapter_id)
+    finally:
+        if os.path.exists(work_dir):
+            shutil.rmtree(work_dir)
+
+def _package_chapter(job):
+    chapter_id, source = job
+    return chapter_id, package_narration(chapter_id, source)
+
+if __name__ == '__main__':
+    # Backfill: package every narrated chapter that has no stream yet
+    from app import app, db, Chapter, AUDIO_FOLDER
+    from sqlalchemy import update
+
+    if not FFMPEG:
+        sys.exit("❌ ffmpeg not found: install it (see the Aptfile) or set FFMPEG_BINARY.")
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    with app.app_context():
+        jobs = [
+            (row.id, os.path.join(AUDIO_FOLDER, row.audio_file))
+            for row in Chapter.query.with_entities(Chapter.id, Chapter.audio_file)
+            .filter(Chapter.audio_file.isnot(None), Chapter.audio_stream.is_(None))
+        ]
+
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chapter_id, playlist in pool.map(_package_chapter, jobs):
+                if playlist:
+                    db.session.execute(
+                        update(Chapter).where(Chapter.id == chapter_id).values(audio_stream=playlist),
+                        execution_options={'synchronize_session': False}
+                    )
+                    db.session.commit()
+                    done += 1
+        print(f"🎧 Packaged {done} of {len(jobs)} narration(s) for streaming.")
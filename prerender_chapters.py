@@ -0,0 +1,57 @@
+from app import app, db, compress_text, decompress_text
+from chapter_render import render_chapter
+from sqlalchemy import inspect, text
+
+COLUMNS = {
+    'word_count': 'INTEGER',
+    'reading_seconds': 'INTEGER',
+    'listening_seconds': 'INTEGER',
+}
+
+def add_render_columns():
+    existing = [col['name'] for col in inspect(db.engine).get_columns('chapters')]
+    # Compressed like chapters.content: bytea on PostgreSQL, a blob on SQLite
+    blob = 'BYTEA' if db.engine.dialect.name == 'postgresql' else 'BLOB'
+    for name, sql_type in {'content_html': blob, **COLUMNS}.items():
+        if name not in existing:
+            with db.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE chapters ADD COLUMN {name} {sql_type}"))
+            print(f"✅ Column '{name}' added.")
+        else:
+            print(f"ℹ️ Column '{name}' already exists.")
+
+def prerender_chapters(batch_size=200):
+    with app.app_context():
+        add_render_columns()
+
+        last_id, rendered = 0, 0
+        while True:
+            rows = db.session.execute(
+                text("SELECT id, content FROM chapters WHERE id > :last AND content_html IS NULL "
+                     "ORDER BY id LIMIT :n"),
+                {"last": last_id, "n": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                html, words, reading, listening = render_chapter(decompress_text(row.content))
+                updates.append({
+                    "id": row.id, "html": compress_text(html), "words": words,
+                    "reading": reading, "listening": listening,
+                })
+            db.session.execute(text(
+                "UPDATE chapters SET content_html = :html, word_count = :words, "
+                "reading_seconds = :reading, listening_seconds = :listening WHERE id = :id"
+            ), updates)
+            db.session.commit()
+
+            rendered += len(updates)
+            last_id = rows[-1].id
+            print(f"… up to chapter {last_id}, {rendered} rendered so far")
+
+        print(f"✅ Pre-rendered {rendered} chapter(s).")
+
+if __name__ == '__main__':
+    prerender_chapters()
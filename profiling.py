@@ -0,0 +1,253 @@
+import gzip
+import json
+import sys
+import time
+
+# Per-request profilers that export speedscope files (https://www.speedscope.app).
+#
+#   Tracer   deterministic: hooks every Python and C call with sys.setprofile, like
+#            cProfile, but keeps the full timeline so it can be drawn as a flamegraph.
+#   Sampler  statistical: a native thread snapshots the request thread's stack every
+#            `interval` seconds. Cheap enough to leave on for a fraction of requests.
+#
+# Both record spans (SQL statements, template renders). They are exported as a second
+# speedscope profile on the same timeline, stacked on top of the sampled Python stacks
+# for the Sampler, and summarised in the capture's metadata.
+#
+# Under gevent many requests share one OS thread, so both profilers only record while
+# the profiled request's greenlet is the one running; time spent in other requests'
+# greenlets is left out of the capture.
+
+try:
+    from gevent import monkey as _gevent_monkey
+except ImportError:
+    _gevent_monkey = None
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+def _native(module, name):
+    # Under gevent, threads are greenlets; the sampler needs a real OS thread
+    if _gevent_monkey and _gevent_monkey.is_module_patched(module):
+        return _gevent_monkey.get_original(module, name)
+    return getattr(__import__(module), name)
+
+_thread_ident = _native('_thread', 'get_ident')
+_switch_watchers = {}  # OS thread id -> (Samplers on it, greenlet trace function it replaced)
+
+def _on_switch(event, args):
+    watchers, previous = _switch_watchers.get(_thread_ident(), ((), None))
+    if event in ('switch', 'throw'):
+        target = args[1]
+        for sampler in watchers:
+            sampler.on_cpu = target is sampler.greenlet
+    if previous is not None:
+        previous(event, args)
+
+class _Frames:
+    """Shared speedscope frame table."""
+
+    def __init__(self):
+        self.frames = []
+        self._index = {}
+
+    def index(self, name, file=None, line=None):
+        key = (name, file, line)
+        if key not in self._index:
+            self._index[key] = len(self.frames)
+            frame = {'name': name}
+            if file:
+                frame['file'], frame['line'] = file, line
+            self.frames.append(frame)
+        return self._index[key]
+
+    def code(self, code):
+        return self.index(code.co_qualname if hasattr(code, 'co_qualname') else code.co_name,
+                          code.co_filename, code.co_firstlineno)
+
+class Capture:
+    def __init__(self, name):
+        self.name = name
+        self.frames = _Frames()
+        self.spans = []  # (kind, label, start, end)
+        self._open_spans = []
+        self.started = time.perf_counter()
+        self.finished = None
+        self.greenlet = greenlet.getcurrent() if greenlet else None
+
+    def elapsed_ms(self, at=None):
+        return ((at if at is not None else time.perf_counter()) - self.started) * 1000
+
+    def open_span(self, kind, label):
+        self._open_spans.append((kind, label, time.perf_counter()))
+
+    def close_span(self):
+        if self._open_spans:
+            kind, label, start = self._open_spans.pop()
+            self.spans.append((kind, label, start, time.perf_counter()))
+
+    def summary(self):
+        totals = {}
+        for kind, label, start, end in self.spans:
+            count, ms = totals.get(kind, (0, 0.0))
+            totals[kind] = (count + 1, ms + (end - start) * 1000)
+        return {
+            'duration_ms': self.elapsed_ms(self.finished),
+            'spans': [
+                {'kind': kind, 'label': label, 'start_ms': self.elapsed_ms(start),
+                 'duration_ms': (end - start) * 1000}
+                for kind, label, start, end in sorted(self.spans, key=lambda span: span[2])
+            ],
+            'totals': {kind: {'count': count, 'ms': ms} for kind, (count, ms) in totals.items()},
+        }
+
+    def document(self, profile):
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.name,
+            'exporter': 'reverie',
+            'shared': {'frames': self.frames.frames},
+            'profiles': [profile],
+        }
+
+    def spans_profile(self):
+        # Spans on one thread never partially overlap, so sorting by (start, -end)
+        # yields properly nested open/close events
+        events, stack = [], []
+        for kind, label, start, end in sorted(self.spans, key=lambda span: (span[2], -span[3])):
+            while stack and stack[-1][1] <= start:
+                frame, stop = stack.pop()
+                events.append({'type': 'C', 'frame': frame, 'at': self.elapsed_ms(stop)})
+            frame = self.frames.index(f'{kind}: {label}')
+            events.append({'type': 'O', 'frame': frame, 'at': self.elapsed_ms(start)})
+            stack.append((frame, end))
+        while stack:
+            frame, stop = stack.pop()
+            events.append({'type': 'C', 'frame': frame, 'at': self.elapsed_ms(stop)})
+        return {
+            'type': 'evented', 'name': f'{self.name} (SQL and templates)', 'unit': 'milliseconds',
+            'startValue': 0, 'endValue': self.elapsed_ms(self.finished), 'events': events,
+        }
+
+    def speedscope_gzip(self):
+        """The capture as a gzipped speedscope file, as stored in profile_captures.data."""
+        document = self.document(self.profile())
+        document['profiles'].append(self.spans_profile())
+        document['reverie'] = self.summary()
+        return gzip.compress(json.dumps(document).encode('utf-8'))
+
+class Tracer(Capture):
+    mode = 'trace'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.events = []
+        self._stack = []
+
+    def _profile(self, frame, event, arg):
+        # The hook is per OS thread; skip other greenlets' calls
+        if self.greenlet is not None and greenlet.getcurrent() is not self.greenlet:
+            return
+        if event == 'call':
+            index = self.frames.code(frame.f_code)
+        elif event == 'c_call':
+            index = self.frames.index(getattr(arg, '__qualname__', getattr(arg, '__name__', repr(arg))))
+        elif self._stack:
+            # 'return' / 'c_return' / 'c_exception'; frames entered before start() have no event
+            self.events.append({'type': 'C', 'frame': self._stack.pop(), 'at': self.elapsed_ms()})
+            return
+        else:
+            return
+        self._stack.append(index)
+        self.events.append({'type': 'O', 'frame': index, 'at': self.elapsed_ms()})
+
+    def start(self):
+        sys.setprofile(self._profile)
+
+    def stop(self):
+        sys.setprofile(None)
+        self.finished = time.perf_counter()
+        end = self.elapsed_ms(self.finished)
+        while self._stack:
+            self.events.append({'type': 'C', 'frame': self._stack.pop(), 'at': end})
+
+    def profile(self):
+        return {
+            'type': 'evented', 'name': self.name, 'unit': 'milliseconds',
+            'startValue': 0, 'endValue': self.elapsed_ms(self.finished), 'events': self.events,
+        }
+
+class Sampler(Capture):
+    mode = 'sample'
+
+    def __init__(self, name, interval=0.001):
+        super().__init__(name)
+        self.interval = interval
+        self.samples = []
+        self.weights = []
+        self._target = _thread_ident()
+        self._running = False
+        self.on_cpu = True  # cleared by _on_switch while another greenlet runs
+        self._done = None
+
+    def _run(self):
+        sleep = _native('time', 'sleep')
+        last = time.perf_counter()
+        while self._running:
+            sleep(self.interval)
+            frame = sys._current_frames().get(self._target)
+            now = time.perf_counter()
+            if frame is not None and self.on_cpu:
+                stack = []
+                while frame is not None:
+                    stack.append(self.frames.code(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                stack += [self.frames.index(f'{kind}: {label}') for kind, label, _ in list(self._open_spans)]
+                self.samples.append(stack)
+                self.weights.append((now - last) * 1000)
+            last = now
+        self._done.release()
+
+    def _watch_switches(self):
+        watchers, previous = _switch_watchers.get(self._target, (set(), None))
+        if not watchers:
+            previous = greenlet.settrace(_on_switch)
+        watchers.add(self)
+        _switch_watchers[self._target] = (watchers, previous)
+
+    def _unwatch_switches(self):
+        watchers, previous = _switch_watchers.get(self._target, (set(), None))
+        watchers.discard(self)
+        if not watchers:
+            greenlet.settrace(previous)
+            _switch_watchers.pop(self._target, None)
+
+    def start(self):
+        if greenlet:
+            self._watch_switches()
+        self._running = True
+        self._done = _native('_thread', 'allocate_lock')()
+        self._done.acquire()
+        _native('_thread', 'start_new_thread')(self._run, ())
+
+    def stop(self):
+        self._running = False
+        self.finished = time.perf_counter()
+        self._done.acquire()
+        if greenlet:
+            self._unwatch_switches()
+
+    def profile(self):
+        return {
+            'type': 'sampled', 'name': self.name, 'unit': 'milliseconds',
+            'startValue': 0, 'endValue': self.elapsed_ms(self.finished),
+            'samples': self.samples, 'weights': self.weights,
+        }
+
+def start_capture(name, mode, interval=0.001):
+    capture = Tracer(name) if mode == 'trace' else Sampler(name, interval)
+    capture.start()
+    return capture
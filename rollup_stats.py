@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta
+from app import app, db, rollup_site_stats, narrate_backlog, StoryChange
+
+# Run periodically (e.g. Heroku Scheduler every 10 minutes: `python rollup_stats.py`)
+# so the admin dashboard never has to aggregate the live tables.
+if __name__ == '__main__':
+    with app.app_context():
+        stats = rollup_site_stats()
+        print(f"✅ Site stats rolled up at {stats.updated_at}.")
+
+        # Workers replay story_changes within seconds, and rebuild their typeahead index
+        # every few hours, so a day of history is plenty
+        cutoff = datetime.utcnow() - timedelta(days=1)
+        pruned = StoryChange.query.filter(StoryChange.changed_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        print(f"🧹 Pruned {pruned} story change(s).")
+
+        # Chapters added without narration, or whose narration failed or was collected
+        # by media_gc.py as a zero-byte file, get their audio here a batch at a time
+        narrated = narrate_backlog()
+        print(f"🎧 Narrated {narrated} backlog chapter(s).")
@@ -0,0 +1,24 @@
+import os
+import sqlite3
+
+# Local stand-in for streaming replication when testing read-replica routing with
+# SQLite files: copies DATABASE_URL onto every DATABASE_REPLICA_URLS file.
+#   DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS=sqlite:///replica.db python sync_replica.py
+
+def sqlite_path(url):
+    if not url.startswith('sqlite:///'):
+        raise ValueError(f"❌ {url} is not a SQLite URL; use real replication for other databases.")
+    return url[len('sqlite:///'):]
+
+def sync_replicas():
+    primary = sqlite3.connect(sqlite_path(os.environ['DATABASE_URL']))
+    for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(','):
+        if url.strip():
+            replica = sqlite3.connect(sqlite_path(url.strip()))
+            primary.backup(replica)
+            replica.close()
+            print(f"✅ Copied primary onto {url.strip()}.")
+    primary.close()
+
+if __name__ == '__main__':
+    sync_replicas()
@@ -0,0 +1,253 @@
+import bisect
+import heapq
+import re
+from array import array
+from collections import OrderedDict
+
+# In-process prefix index for the search box's as-you-type suggestions.
+#
+# Keys live in one sorted list of "<normalized>\0<label>" strings with parallel arrays
+# of refs and popularity scores, so memory is a string plus two machine ints per key.
+# Stories use their id as ref; authors and hashtags are aggregate entries with
+# negative refs whose score is the summed popularity of their stories.
+#
+# A prefix lookup is a bisect plus a top-k over the matching range. Ranges longer than
+# SCAN_LIMIT (short prefixes like "t") are answered from a bounded LRU of results
+# precomputed at build time. Writes patch those lists in place: each holds the exact
+# top CACHE_DEPTH_FACTOR * k of its range, so an entry whose score drops or that is
+# removed simply leaves the list, and a prefix is only recomputed once fewer than k
+# entries are left.
+
+MAX_KEY_LEN = 48
+MAX_LABEL_LEN = 80
+SCAN_LIMIT = 512
+CACHE_SIZE = 50000
+CACHE_DEPTH_FACTOR = 2
+HASHTAG = re.compile(r'#(\w+)')
+
+STORY, AUTHOR, TAG = 'story', 'author', 'tag'
+
+def normalize(value):
+    return ' '.join((value or '').casefold().split())[:MAX_KEY_LEN]
+
+def hashtags(description):
+    return {tag.casefold() for tag in HASHTAG.findall(description or '')}
+
+def popularity(reads, votes):
+    return (reads or 0) + 5 * (votes or 0)
+
+class PrefixIndex:
+    def __init__(self, k=8):
+        self.k = k
+        self._depth = k * CACHE_DEPTH_FACTOR
+        self._keys = []
+        self._refs = array('q')
+        self._scores = array('q')
+        self._aggregates = {}  # (kind, normalized) -> [ref, story count, key]
+        self._kinds = {}  # aggregate ref -> kind
+        self._next_ref = -1
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    # Building
+
+    def bulk_load(self, stories):
+        """Replace the index with `stories`: iterable of (id, title, author, description, score)."""
+        entries, totals = [], {}
+        for story_id, title, author, description, score in stories:
+            if normalize(title):
+                entries.append((self._key(title), story_id, score))
+            for kind, label in self._aggregate_labels(author, description):
+                total = totals.setdefault((kind, normalize(label)), [label, 0, 0])
+                total[1] += score
+                total[2] += 1
+
+        self._aggregates, self._kinds, self._next_ref = {}, {}, -1
+        for (kind, normalized), (label, score, count) in totals.items():
+            ref = self._new_aggregate(kind, normalized, label, count)
+            entries.append((self._aggregates[(kind, normalized)][2], ref, score))
+
+        entries.sort(key=lambda entry: entry[0])
+        self._keys = [entry[0] for entry in entries]
+        self._refs = array('q', (entry[1] for entry in entries))
+        self._scores = array('q', (entry[2] for entry in entries))
+        self._cache.clear()
+        self._warm_cache()
+
+    def _warm_cache(self):
+        # Precompute every prefix whose range is too long to scan per keystroke. Only
+        # extensions of a long prefix can be long, so walk down one character at a time.
+        level = [(0, len(self._keys))]
+        for n in range(1, MAX_KEY_LEN + 1):
+            next_level = []
+            for lo, hi in level:
+                children = {key[:n] for key in self._keys[lo:hi] if key[n - 1:n] not in ('', '\0')}
+                for prefix in children:
+                    child_lo, child_hi = self._range(prefix)
+                    if child_hi - child_lo > SCAN_LIMIT:
+                        self._cache_put(prefix, self._top(child_lo, child_hi, self._depth))
+                        next_level.append((child_lo, child_hi))
+            if not next_level:
+                break
+            level = next_level
+
+    # Incremental updates
+
+    # A story whose title entry is already in (or already gone from) the index is
+    # skipped, so a change replayed on top of a load that included it is a no-op
+
+    def add_story(self, story_id, title, author, description, score):
+        if normalize(title):
+            if self._find(self._key(title), story_id) is not None:
+                return
+            self._insert(self._key(title), story_id, score)
+        for kind, label in self._aggregate_labels(author, description):
+            self._adjust_aggregate(kind, label, score, 1)
+
+    def remove_story(self, story_id, title, author, description, score):
+        if normalize(title):
+            if self._find(self._key(title), story_id) is None:
+                return
+            self._delete(self._key(title), story_id)
+        for kind, label in self._aggregate_labels(author, description):
+            self._adjust_aggregate(kind, label, -score, -1)
+
+    def _new_aggregate(self, kind, normalized, label, count):
+        ref = self._next_ref
+        self._next_ref -= 1
+        self._aggregates[(kind, normalized)] = [ref, count, self._key(label, kind)]
+        self._kinds[ref] = kind
+        return ref
+
+    def _adjust_aggregate(self, kind, label, score_delta, count_delta):
+        normalized = normalize(label)
+        entry = self._aggregates.get((kind, normalized))
+
+        if entry is None:
+            if count_delta > 0:
+                ref = self._new_aggregate(kind, normalized, label, count_delta)
+                self._insert(self._aggregates[(kind, normalized)][2], ref, max(score_delta, 0))
+            return
+
+        ref, count, key = entry
+        pos = self._find(key, ref)
+        entry[1] = count + count_delta
+        if entry[1] <= 0:
+            if pos is not None:
+                self._delete(key, ref)
+            del self._aggregates[(kind, normalized)]
+            del self._kinds[ref]
+            return
+        if pos is not None:
+            # The key is unchanged, so the entry keeps its position; only its rank moves
+            self._scores[pos] = max(self._scores[pos] + score_delta, 0)
+            self._patch_cache(key, self._result(pos))
+
+    def _insert(self, key, ref, score):
+        if self._find(key, ref) is not None:
+            return
+        pos = bisect.bisect_left(self._keys, key)
+        self._keys.insert(pos, key)
+        self._refs.insert(pos, ref)
+        self._scores.insert(pos, score)
+        self._patch_cache(key, self._result(pos))
+
+    def _delete(self, key, ref):
+        pos = self._find(key, ref)
+        if pos is None:
+            return
+        result = self._result(pos)
+        del self._keys[pos]
+        del self._refs[pos]
+        del self._scores[pos]
+        self._patch_cache(key, result, removed=True)
+
+    def _patch_cache(self, key, result, removed=False):
+        """Move `result` (new, rescored or removed) within the cached lists of its prefixes."""
+        identity = self._identity(result)
+        normalized = key.split('\0', 1)[0]
+        for n in range(1, len(normalized) + 1):
+            prefix = normalized[:n]
+            cached = self._cache.get(prefix)
+            if cached is None:
+                continue
+            # Without the entry, the list is still the exact top of the rest of the range
+            kept = [item for item in cached if self._identity(item) != identity]
+            if not removed and kept and result['score'] >= kept[-1]['score']:
+                kept.append(result)
+                kept.sort(key=lambda item: -item['score'])
+                del kept[self._depth:]
+            if len(kept) < self.k:
+                # Entries ranked below the list may now belong in the top k
+                del self._cache[prefix]
+            else:
+                cached[:] = kept
+
+    def _find(self, key, ref):
+        pos = bisect.bisect_left(self._keys, key)
+        while pos < len(self._keys) and self._keys[pos] == key:
+            if self._refs[pos] == ref:
+                return pos
+            pos += 1
+        return None
+
+    # Queries
+
+    def suggest(self, query):
+        prefix = normalize(query.lstrip('#'))
+        if not prefix:
+            return []
+
+        cached = self._cache.get(prefix)
+        if cached is not None:
+            self._cache.move_to_end(prefix)
+            return cached[:self.k]
+
+        lo, hi = self._range(prefix)
+        if hi - lo > SCAN_LIMIT:
+            results = self._top(lo, hi, self._depth)
+            self._cache_put(prefix, results)
+            return results[:self.k]
+        return self._top(lo, hi, self.k)
+
+    def _range(self, prefix):
+        lo = bisect.bisect_left(self._keys, prefix)
+        # Every key extending `prefix` sorts below prefix + the highest code point
+        hi = bisect.bisect_left(self._keys, prefix + '\U0010ffff', lo)
+        return lo, hi
+
+    def _top(self, lo, hi, n):
+        positions = heapq.nlargest(n, range(lo, hi), key=self._scores.__getitem__)
+        return [self._result(pos) for pos in positions]
+
+    def _result(self, pos):
+        ref = self._refs[pos]
+        label = self._keys[pos].split('\0', 1)[1]
+        if ref > 0:
+            return {'type': STORY, 'id': ref, 'label': label, 'score': self._scores[pos]}
+        return {'type': self._kinds[ref], 'label': label, 'score': self._scores[pos]}
+
+    def _cache_put(self, prefix, results):
+        self._cache[prefix] = results
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    # Helpers
+
+    @staticmethod
+    def _identity(result):
+        return (result['type'], result['id'] if result['type'] == STORY else result['label'])
+
+    @staticmethod
+    def _key(label, kind=STORY):
+        display = f'#{label}' if kind == TAG else label
+        return f'{normalize(label)}\0{display[:MAX_LABEL_LEN]}'
+
+    @staticmethod
+    def _aggregate_labels(author, description):
+        labels = [(TAG, tag) for tag in sorted(hashtags(description))]
+        if normalize(author):
+            labels.append((AUTHOR, author))
+        return labels